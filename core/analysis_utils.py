@@ -6,8 +6,15 @@
 
 import re
 import json
+import asyncio
+import hashlib
+import heapq
+import time
+from array import array
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Optional, Callable, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Callable, Any, Awaitable, Tuple
 from collections import Counter
 
 from src.config.config import model_config
@@ -16,24 +23,253 @@ from .constants import AnalysisConfig
 
 logger = get_logger("chat_analysis_utils")
 
+# 称号分析要求（单独分析与合并分析共用）
+_TITLES_REQUIREMENTS = """要求：
+1. 称号2-4个汉字
+2. 基于真实数据，不要编造
+3. 避免重复类型（不要多个"龙王""话痨"）
+4. 有创意，避免陈词滥调
+5. 理由严格控制在50-70字，引用数据说明为什么
+
+参考分类：活跃度（龙王、潜水员）、时间特征（夜猫子）、内容风格（段子手）、表情/情绪（表情帝）、互动特征（接梗高手）"""
+
+_TITLES_ITEM_SCHEMA = """{
+    "name": "用户名",
+    "title": "称号（2-4字）",
+    "reason": "获得理由,引用数据（50-70字）"
+  }"""
+
+# 金句提取要求（单独分析与合并分析共用）
+_QUOTES_REQUIREMENTS = """优先级（从高到低）：
+1. 神回复、接梗高手（优先选择回复的那句，不是发起的）
+2. 有上下文才有笑点的梗
+3. 精彩吐槽或离谱观点
+4. 高/低情商发言
+
+要求：
+- 每个金句来自不同发言人
+- 避免平淡陈述句、问候语
+- 内容水可以只返回2-3个
+- 理由严格控制在50-70字，说明为什么有趣、回应了什么"""
+
+_QUOTES_ITEM_SCHEMA = """{
+    "content": "金句原文",
+    "sender": "发言人",
+    "reason": "选择理由（50-70字）"
+  }"""
+
+# prompt 模板（调用时用 str.format 填入动态数据和上面的公共片段）
+# 固定的任务说明、要求和 JSON 格式放在前面，动态数据放在最后：各次调用的 prompt 前缀保持一致，
+# 支持前缀缓存的模型服务（如 OpenAI、DeepSeek 的自动上下文缓存）可以复用这部分的计算和计费
+_TITLES_PROMPT_TEMPLATE = """根据群友数据创造有趣的称号。
+
+{titles_requirements}
+
+返回JSON（不要markdown代码块，不要emoji）：
+[
+  {titles_schema}
+]
+
+用户数据：
+{users_info}"""
+
+_QUOTES_PROMPT_TEMPLATE = """从群聊记录中挑选3-5句最有趣的金句。
+
+{quotes_requirements}
+
+返回JSON（不要markdown代码块，不要emoji）：
+[
+  {quotes_schema}
+]
+
+群聊记录：
+{messages_text}"""
+
+_TITLES_QUOTES_PROMPT_TEMPLATE = """根据群聊数据完成以下两项任务。
+
+任务一：根据群友数据创造有趣的称号。
+
+{titles_requirements}
+
+任务二：从群聊记录中挑选3-5句最有趣的金句。
+
+{quotes_requirements}
+
+返回JSON对象（不要markdown代码块，不要emoji）：
+{{
+  "titles": [
+    {titles_schema}
+  ],
+  "quotes": [
+    {quotes_schema}
+  ]
+}}
+
+用户数据：
+{users_info}
+
+群聊记录：
+{messages_text}"""
+
+# 模板中的公共片段
+_PROMPT_PARTS = {
+    "titles_requirements": _TITLES_REQUIREMENTS,
+    "titles_schema": _TITLES_ITEM_SCHEMA,
+    "quotes_requirements": _QUOTES_REQUIREMENTS,
+    "quotes_schema": _QUOTES_ITEM_SCHEMA,
+}
+
+# 可选依赖 orjson：C 实现的 JSON 解析，未安装时回退到标准库 json
+# （orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，原有的异常处理无需改动）
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# 可选依赖 json-repair：修复 LLM 输出中常见的格式错误（多余逗号、缺引号、截断等），
+# 未安装时使用下方基于正则清理的修复逻辑
+try:
+    from json_repair import loads as _json_repair_loads
+except ImportError:
+    _json_repair_loads = None
+
+# 用于从指定位置解析出第一个完整 JSON 值（忽略其后的多余内容）
+_JSON_DECODER = json.JSONDecoder()
+
+# LLM 结果缓存：{key: (写入时间, (success, result, reasoning, model_name))}
+_LLM_CACHE: Dict[str, Tuple[float, tuple]] = {}
+
+
+# Emoji 字符类（完整Unicode范围）
+_EMOJI_REGEX = (
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "\U0001F900-\U0001F9FF"  # supplemental symbols
+    "]+"
+)
+
+# 可选依赖 google-re2：基于 DFA 的线性时间匹配，未安装时回退到标准库 re
+try:
+    import re2
+    _EMOJI_RE2 = re2.compile(_EMOJI_REGEX)
+except Exception:
+    _EMOJI_RE2 = None
+
+
+# 每个用户的 24 小时发言计数模板（复制为 array('I')，比 dict/list 更省内存）
+_EMPTY_HOURS = array("I", [0] * 24)
+
+
+# 时区偏移都是 15 分钟的整数倍：同一个 15 分钟区间内的小时相同，同一分钟内的 "时:分" 相同。
+# 按区间缓存可省去绝大部分 datetime 构造，同时保持夏令时等情况下与 fromtimestamp 一致
+@lru_cache(maxsize=4096)
+def _hour_of_quarter(quarter: int) -> int:
+    """返回时间戳 // 900 所在 15 分钟区间的本地小时"""
+    return datetime.fromtimestamp(quarter * 900).hour
+
+
+@lru_cache(maxsize=4096)
+def _hm_of_minute(minute: int) -> str:
+    """返回时间戳 // 60 所在分钟的本地 "时:分" 字符串"""
+    return datetime.fromtimestamp(minute * 60).strftime("%H:%M")
+
+
+@dataclass
+class MessageScan:
+    """单次遍历聊天记录得到的各项中间结果"""
+
+    formatted_text: str = ""  # format_messages 的结果，用于生成总结
+    user_stats: Dict[str, Dict] = field(default_factory=dict)  # analyze_user_stats 的结果
+    quotes_text: str = ""  # 金句候选消息文本
+    hourly_distribution: Dict[int, int] = field(default_factory=dict)  # 24小时发言分布
+    participant_count: int = 0  # 有昵称的参与人数
+    user_samples: Dict[str, List[str]] = field(default_factory=dict)  # 每个用户前 20 条有效发言（炫压抑指数用）
+
 
 class ChatAnalysisUtils:
     """聊天记录分析工具类"""
 
     # Emoji 正则表达式（完整Unicode范围）
-    EMOJI_PATTERN = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"  # emoticons
-        "\U0001F300-\U0001F5FF"  # symbols & pictographs
-        "\U0001F680-\U0001F6FF"  # transport & map symbols
-        "\U0001F1E0-\U0001F1FF"  # flags
-        "\U00002702-\U000027B0"
-        "\U000024C2-\U0001F251"
-        "\U0001F900-\U0001F9FF"  # supplemental symbols
-        "]+",
-        flags=re.UNICODE
+    EMOJI_PATTERN = re.compile(_EMOJI_REGEX, flags=re.UNICODE)
+
+    # 预编译的常用正则
+    _AT_MENTION_RE = re.compile(r'@[^<\s]+<\d+>\s*')  # @昵称<QQ号> 形式的提及
+    _WORD_RE = re.compile(r'[\u4e00-\u9fff]+|[a-zA-Z]+')  # 中文词段 / 英文单词
+    _CJK_SPACE_CJK = re.compile(r'([\u4e00-\u9fff])\s+([\u4e00-\u9fff])')  # 中文之间的空白
+    # 中文与中文/数字之间、数字与中文之间的空白（数字与数字之间的空白保留），一次扫描完成
+    _CJK_DIGIT_SPACE = re.compile(
+        r'(?<=[\u4e00-\u9fff])\s+(?=[\u4e00-\u9fff\d])|(?<=\d)\s+(?=[\u4e00-\u9fff])'
     )
 
+    # re2 仅用于快速判断文本中是否存在匹配：其 Python 封装的 findall/sub 在逐个
+    # 产出匹配时开销很大（中文聊天几乎每行都命中），实际统计/清理仍交给标准库 re
+    _EMOJI_PREFILTER = _EMOJI_RE2
+
+    # 缓存的 replyer 模型配置（首次使用时解析）
+    _replyer_config = None
+
+    @staticmethod
+    def get_replyer_config():
+        """获取用于分析的 replyer 模型配置，首次调用后复用
+
+        Returns:
+            model_config.model_task_config.replyer
+        """
+        if ChatAnalysisUtils._replyer_config is None:
+            ChatAnalysisUtils._replyer_config = model_config.model_task_config.replyer
+        return ChatAnalysisUtils._replyer_config
+
+    @staticmethod
+    async def _generate_cached(prompt: str, model_config: Any, request_type: str) -> tuple:
+        """调用 LLM 生成，相同模型和 prompt 在 LLM_CACHE_TTL 内直接复用上次的成功结果
+
+        同一天内重复触发总结（如多次执行命令）时，聊天记录没有变化的部分会得到
+        完全相同的 prompt，无需再次请求 LLM。
+
+        Args:
+            prompt: 提示词
+            model_config: 模型配置
+            request_type: 请求类型
+
+        Returns:
+            (success, result, reasoning, model_name)，与 llm_api.generate_with_model 一致
+        """
+        ttl = AnalysisConfig.LLM_CACHE_TTL
+        if ttl <= 0:
+            return await llm_api.generate_with_model(
+                prompt=prompt, model_config=model_config, request_type=request_type
+            )
+
+        # 缓存键包含模型列表：不同模型配置生成的结果互不复用
+        model_key = repr(getattr(model_config, "model_list", model_config))
+        key = hashlib.blake2b(
+            f"{request_type}\n{model_key}\n{prompt}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        now = time.monotonic()
+        cached = _LLM_CACHE.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            logger.debug(f"命中 LLM 结果缓存: {request_type}")
+            return cached[1]
+
+        response = await llm_api.generate_with_model(
+            prompt=prompt, model_config=model_config, request_type=request_type
+        )
+
+        # 只缓存成功的结果，失败时下次仍会重新请求
+        if response[0]:
+            _LLM_CACHE.pop(key, None)
+            _LLM_CACHE[key] = (time.monotonic(), response)
+            # 超出容量时淘汰最早写入的条目
+            while len(_LLM_CACHE) > AnalysisConfig.LLM_CACHE_MAX_SIZE:
+                _LLM_CACHE.pop(next(iter(_LLM_CACHE)))
+
+        return response
+
     @staticmethod
     def format_messages(messages: List[dict]) -> str:
         """格式化聊天记录为文本
@@ -45,22 +281,30 @@ class ChatAnalysisUtils:
             格式化的聊天记录文本
         """
         formatted = []
+        append = formatted.append
+        # 同一分钟内的消息复用 "时:分:" 前缀，只需补上秒数
+        last_minute = None
+        minute_prefix = ""
         for msg in messages:
-            timestamp = msg.get("time", 0)
-            time_str = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
-            nickname = msg.get("user_nickname", "未知用户")
-            cardname = msg.get("user_cardname", "")
-            display_name = cardname if cardname else nickname
-            text = msg.get("processed_plain_text", "")
+            get = msg.get
+            text = get("processed_plain_text", "")
+            if not text:
+                continue
 
-            if text:
-                formatted.append(f"[{time_str}] {display_name}: {text}")
+            timestamp = get("time", 0)
+            minute = timestamp // 60
+            if minute != last_minute:
+                last_minute = minute
+                minute_prefix = f"{_hm_of_minute(minute)}:"
+            display_name = get("user_cardname", "") or get("user_nickname", "未知用户")
+
+            append(f"[{minute_prefix}{int(timestamp % 60):02d}] {display_name}: {text}")
 
         return "\n".join(formatted)
 
     @staticmethod
     def count_emojis(text: str) -> int:
-        """统计文本中的 emoji 数量（使用正则表达式）
+        """统计文本中的 emoji 数量（使用正则表达式，安装 re2 时先用 re2 快速排除无匹配文本）
 
         Args:
             text: 待统计的文本
@@ -68,9 +312,32 @@ class ChatAnalysisUtils:
         Returns:
             emoji 数量
         """
+        # emoji 范围都在 U+2702 之后，空文本和纯 ASCII 文本不可能匹配（isascii 为 O(1) 检查）
+        if not text or text.isascii():
+            return 0
+        prefilter = ChatAnalysisUtils._EMOJI_PREFILTER
+        if prefilter is not None and prefilter.search(text) is None:
+            return 0
         matches = ChatAnalysisUtils.EMOJI_PATTERN.findall(text)
         return len(matches)
 
+    @staticmethod
+    def _strip_emojis(text: str) -> str:
+        """移除文本中的 emoji（安装 re2 时先用 re2 快速排除无匹配文本）
+
+        Args:
+            text: 待处理的文本
+
+        Returns:
+            移除 emoji 后的文本
+        """
+        if not text or text.isascii():
+            return text
+        prefilter = ChatAnalysisUtils._EMOJI_PREFILTER
+        if prefilter is not None and prefilter.search(text) is None:
+            return text
+        return ChatAnalysisUtils.EMOJI_PATTERN.sub('', text)
+
     @staticmethod
     def analyze_user_stats(messages: List[dict]) -> Dict[str, Dict]:
         """分析用户统计数据
@@ -79,115 +346,326 @@ class ChatAnalysisUtils:
             messages: 聊天记录列表
 
         Returns:
-            用户统计字典，格式: {user_id: {nickname, message_count, char_count, emoji_count, hours}}
+            用户统计字典，格式: {user_id: {nickname, message_count, char_count, emoji_count, hours}}，
+            其中 hours 为长度 24 的 array('I')，下标为小时
         """
         user_stats = {}
+        # 按用户收集 (发言文本列表, 小时计数器)，消息数/字数/emoji 数在循环结束后
+        # 交给 len/sum/正则 按用户批量计算，循环内每条消息只做一次字典查找
+        user_buffers = {}
+
+        # 热循环中用到的属性/方法提前绑定为局部变量，减少每条消息的查找开销
+        hour_of_quarter = _hour_of_quarter
+        get_buffer = user_buffers.get
+        # 原始 user_id -> 字符串形式，同一用户只做一次 str() 转换
+        uid_cache = {}
 
         for msg in messages:
-            user_id = str(msg.get("user_id", ""))
+            get = msg.get
+            raw_id = get("user_id", "")
+            user_id = uid_cache.get(raw_id)
+            if user_id is None:
+                user_id = uid_cache[raw_id] = str(raw_id)
             if not user_id:
                 continue
 
-            nickname = msg.get("user_nickname", "未知用户")
-            text = msg.get("processed_plain_text", "")
+            buffer = get_buffer(user_id)
+            if buffer is None:
+                hours = array("I", _EMPTY_HOURS)  # 各小时发言次数（下标为小时）
+                user_stats[user_id] = {
+                    "user_id": user_id,  # 保存 user_id
+                    "nickname": get("user_nickname", "未知用户"),
+                    "message_count": 0,
+                    "char_count": 0,
+                    "emoji_count": 0,
+                    "hours": hours,
+                }
+                buffer = user_buffers[user_id] = ([], hours)
+            texts, hours = buffer
+
+            texts.append(get("processed_plain_text", ""))
+
+            # 统计发言时间
+            hours[hour_of_quarter(get("time", 0) // 900)] += 1
+
+        ChatAnalysisUtils._finalize_user_stats(user_stats, user_buffers)
+        return user_stats
+
+    @staticmethod
+    def _finalize_user_stats(user_stats: Dict[str, Dict], user_buffers: Dict[str, tuple]):
+        """根据按用户收集的发言文本填充消息数、字数和 emoji 数
+
+        Args:
+            user_stats: 用户统计字典（原地更新）
+            user_buffers: {user_id: (发言文本列表, 小时计数器)}
+        """
+        for user_id, (texts, _) in user_buffers.items():
+            stats = user_stats[user_id]
+            stats["message_count"] = len(texts)
+            stats["char_count"] = sum(map(len, texts))
+            # 每个用户只做一次 emoji 匹配（换行符不属于 emoji，不会把相邻消息的 emoji 连成一段）
+            stats["emoji_count"] = ChatAnalysisUtils.count_emojis("\n".join(texts))
+
+    @staticmethod
+    def scan_messages(messages: List[dict]) -> MessageScan:
+        """一次遍历聊天记录，同时得到格式化文本、用户统计、金句候选、小时分布和发言样本
+
+        结果与分别调用 format_messages、analyze_user_stats、_build_quotes_messages_text、
+        逐条统计小时分布以及 analyze_depression_index 中的样本收集一致，但每条消息只读取一次字段。
 
-            if user_id not in user_stats:
+        Args:
+            messages: 聊天记录列表
+
+        Returns:
+            MessageScan 扫描结果
+        """
+        formatted = []
+        quote_lines = []
+        user_stats = {}
+        user_buffers = {}
+        user_samples = {}
+        hourly_distribution = Counter()
+        participants = set()
+
+        append_formatted = formatted.append
+        append_quote = quote_lines.append
+        add_participant = participants.add
+        get_buffer = user_buffers.get
+        clean_quote = ChatAnalysisUtils._clean_quote_text
+        uid_cache = {}  # 原始 user_id -> 字符串形式
+        last_minute = None
+        minute_prefix = ""
+        hour = 0
+
+        for msg in messages:
+            get = msg.get
+            text = get("processed_plain_text", "")
+            nickname = get("user_nickname", "未知用户")
+            display_name = get("user_cardname", "") or nickname
+            timestamp = get("time", 0)
+
+            # 同一分钟内的消息复用 "时:分:" 前缀和小时
+            minute = timestamp // 60
+            if minute != last_minute:
+                last_minute = minute
+                minute_prefix = f"{_hm_of_minute(minute)}:"
+                hour = _hour_of_quarter(timestamp // 900)
+            hourly_distribution[hour] += 1
+
+            if get("user_nickname", ""):
+                add_participant(nickname)
+
+            if text:
+                append_formatted(f"[{minute_prefix}{int(timestamp % 60):02d}] {display_name}: {text}")
+
+            quote = clean_quote(text)
+            if quote is not None:
+                append_quote(f"[{minute_prefix[:-1]}] {display_name}: {quote}")
+
+            raw_id = get("user_id", "")
+            user_id = uid_cache.get(raw_id)
+            if user_id is None:
+                user_id = uid_cache[raw_id] = str(raw_id)
+            if not user_id:
+                continue
+
+            buffer = get_buffer(user_id)
+            if buffer is None:
+                hours = array("I", _EMPTY_HOURS)  # 各小时发言次数（下标为小时）
                 user_stats[user_id] = {
                     "user_id": user_id,  # 保存 user_id
                     "nickname": nickname,
                     "message_count": 0,
                     "char_count": 0,
                     "emoji_count": 0,
-                    "hours": Counter(),  # 各小时发言次数
+                    "hours": hours,
                 }
+                buffer = user_buffers[user_id] = ([], hours)
+            texts, hours = buffer
+            texts.append(text)
+            hours[hour] += 1
+
+            # 每人最多收集20条有效发言（过滤太短的消息）
+            if len(text) >= 5:
+                samples = user_samples.get(user_id)
+                if samples is None:
+                    user_samples[user_id] = [text]
+                elif len(samples) < 20:
+                    samples.append(text)
+
+        ChatAnalysisUtils._finalize_user_stats(user_stats, user_buffers)
+
+        return MessageScan(
+            formatted_text="\n".join(formatted),
+            user_stats=user_stats,
+            quotes_text=ChatAnalysisUtils._join_quote_lines(quote_lines),
+            hourly_distribution=dict(hourly_distribution),
+            participant_count=len(participants),
+            user_samples=user_samples,
+        )
 
-            stats = user_stats[user_id]
-            stats["message_count"] += 1
-            stats["char_count"] += len(text)
+    @staticmethod
+    def filter_active_users(user_stats: Dict[str, Dict]) -> Dict[str, Dict]:
+        """筛选发言数 >= MIN_MESSAGES_FOR_TITLE 的活跃用户
+
+        Args:
+            user_stats: 用户统计数据
 
-            # 使用改进的 emoji 统计
-            stats["emoji_count"] += ChatAnalysisUtils.count_emojis(text)
+        Returns:
+            活跃用户的统计数据 {user_id: stats}
+        """
+        return {
+            uid: stats for uid, stats in user_stats.items()
+            if stats["message_count"] >= AnalysisConfig.MIN_MESSAGES_FOR_TITLE
+        }
 
-            # 统计发言时间
+    @staticmethod
+    def _build_titles_users_info(user_stats: Dict, active_users: Optional[Dict] = None) -> str:
+        """构建称号分析用的用户数据文本
+
+        Args:
+            user_stats: 用户统计数据
+            active_users: 预先筛选好的活跃用户（可选），为 None 时从 user_stats 筛选
+
+        Returns:
+            用户数据文本，没有活跃用户时返回空字符串
+        """
+        # 只分析发言 >= 配置的最小发言数的用户
+        if active_users is None:
+            active_users = ChatAnalysisUtils.filter_active_users(user_stats)
+
+        if not active_users:
+            return ""
+
+        # 构建用户数据文本（只取发言最多的前 N 个用户，无需对全部用户排序）
+        users_text = []
+        for user_id, stats in heapq.nlargest(
+            AnalysisConfig.MAX_USERS_FOR_TITLE,  # 使用配置的最大用户数
+            active_users.items(),
+            key=lambda x: x[1]["message_count"]
+        ):
+            night_messages = sum(stats["hours"][:6])
+            avg_chars = stats["char_count"] / stats["message_count"] if stats["message_count"] > 0 else 0
+            emoji_ratio = stats["emoji_count"] / stats["message_count"] if stats["message_count"] > 0 else 0
+            night_ratio = night_messages / stats["message_count"] if stats["message_count"] > 0 else 0
+
+            users_text.append(
+                f"- {stats['nickname']}: "
+                f"发言{stats['message_count']}条, 平均{avg_chars:.1f}字, "
+                f"表情比例{emoji_ratio:.2f}, 夜间发言比例{night_ratio:.2f}"
+            )
+
+        return "\n".join(users_text)
+
+    @staticmethod
+    def _build_quotes_messages_text(messages: List[dict]) -> str:
+        """构建金句提取用的聊天记录文本
+
+        Args:
+            messages: 聊天记录列表
+
+        Returns:
+            候选消息文本，没有合适消息时返回空字符串
+        """
+        # 提取适合的消息（使用配置的长度范围），直接生成最终的文本行
+        lines = []
+        for msg in messages:
+            text = ChatAnalysisUtils._clean_quote_text(msg.get("processed_plain_text", ""))
+            if text is None:
+                continue
+
+            display_name = msg.get("user_cardname", "") or msg.get("user_nickname", "未知用户")
             timestamp = msg.get("time", 0)
-            hour = datetime.fromtimestamp(timestamp).hour
-            stats["hours"][hour] += 1
+            time_str = _hm_of_minute(timestamp // 60)
 
-        return user_stats
+            lines.append(f"[{time_str}] {display_name}: {text}")
+
+        # 构建消息文本
+        return ChatAnalysisUtils._join_quote_lines(lines)
+
+    @staticmethod
+    def _join_quote_lines(lines: List[str]) -> str:
+        """拼接金句候选文本，超出 MAX_QUOTE_CONTEXT_CHARS 时按时间均匀抽样
+
+        均匀抽样保证全天各时段都有候选消息，而不是只保留开头或结尾的一段。
+        候选文本不足 MIN_QUOTE_CONTEXT_CHARS 时内容太少，不值得调用 LLM，返回空字符串。
+
+        Args:
+            lines: 按时间排列的候选消息行
+
+        Returns:
+            拼接后的候选消息文本，内容过少时返回空字符串
+        """
+        budget = AnalysisConfig.MAX_QUOTE_CONTEXT_CHARS
+        total = sum(map(len, lines)) + len(lines) - 1
+        if total < AnalysisConfig.MIN_QUOTE_CONTEXT_CHARS:
+            if lines:
+                logger.info(f"金句候选消息过少（{len(lines)}条），跳过金句提取")
+            return ""
+        if total <= budget:
+            return "\n".join(lines)
+
+        # 按平均行长估算能保留的行数，再等间隔抽取
+        count = len(lines)
+        keep = max(1, budget * count // total)
+        sampled = [lines[i * count // keep] for i in range(keep)]
+
+        # 估算偏差导致仍超出预算时，从末尾逐行去掉
+        size = sum(map(len, sampled)) + len(sampled) - 1
+        while len(sampled) > 1 and size > budget:
+            size -= len(sampled.pop()) + 1
+
+        logger.info(f"金句候选消息过多（{count}条），已按时间均匀抽样保留{len(sampled)}条")
+        return "\n".join(sampled)
+
+    @staticmethod
+    def _clean_quote_text(text: str) -> Optional[str]:
+        """清理单条消息并判断是否可作为金句候选
+
+        Args:
+            text: 消息文本
+
+        Returns:
+            清理后的文本，不适合作为金句候选时返回 None
+        """
+        # 清理 @ 提及格式（如 @理理<123456> → 去掉整个提及部分）
+        # 使用正则移除 @用户名<数字> 格式（大多数消息不含 @，先用 in 快速排除）
+        if '@' in text:
+            text = ChatAnalysisUtils._AT_MENTION_RE.sub('', text)
+        text = text.strip()
+
+        if (AnalysisConfig.MIN_QUOTE_LENGTH <= len(text) <= AnalysisConfig.MAX_QUOTE_LENGTH
+            and not text.startswith(("http", "www", "/"))):
+            return text
+        return None
 
     @staticmethod
     async def analyze_user_titles(
-        messages: List[dict],
         user_stats: Dict,
-        get_config: Callable = None
+        get_config: Callable = None,
+        active_users: Optional[Dict] = None
     ) -> Optional[List[Dict]]:
         """使用 LLM 分析群友称号
 
         Args:
-            messages: 聊天记录列表（用于上下文）
             user_stats: 用户统计数据
             get_config: 配置获取函数（可选）
+            active_users: 预先筛选好的活跃用户（可选），为 None 时从 user_stats 筛选
 
         Returns:
             称号列表，格式: [{name, title, reason}, ...]
         """
         try:
-            # 只分析发言 >= 配置的最小发言数的用户
-            active_users = {
-                uid: stats for uid, stats in user_stats.items()
-                if stats["message_count"] >= AnalysisConfig.MIN_MESSAGES_FOR_TITLE
-            }
-
-            if not active_users:
+            users_info = ChatAnalysisUtils._build_titles_users_info(user_stats, active_users)
+            if not users_info:
                 return []
 
-            # 构建用户数据文本
-            users_text = []
-            for user_id, stats in sorted(
-                active_users.items(),
-                key=lambda x: x[1]["message_count"],
-                reverse=True
-            )[:AnalysisConfig.MAX_USERS_FOR_TITLE]:  # 使用配置的最大用户数
-                night_messages = sum(stats["hours"][h] for h in range(0, 6))
-                avg_chars = stats["char_count"] / stats["message_count"] if stats["message_count"] > 0 else 0
-                emoji_ratio = stats["emoji_count"] / stats["message_count"] if stats["message_count"] > 0 else 0
-                night_ratio = night_messages / stats["message_count"] if stats["message_count"] > 0 else 0
-
-                users_text.append(
-                    f"- {stats['nickname']}: "
-                    f"发言{stats['message_count']}条, 平均{avg_chars:.1f}字, "
-                    f"表情比例{emoji_ratio:.2f}, 夜间发言比例{night_ratio:.2f}"
-                )
-
-            users_info = "\n".join(users_text)
-
             # 构建 prompt
-            prompt = f"""根据群友数据创造有趣的称号。
-
-用户数据：
-{users_info}
-
-要求：
-1. 称号2-4个汉字
-2. 基于真实数据，不要编造
-3. 避免重复类型（不要多个"龙王""话痨"）
-4. 有创意，避免陈词滥调
-5. 理由严格控制在50-70字，引用数据说明为什么
-
-参考分类：活跃度（龙王、潜水员）、时间特征（夜猫子）、内容风格（段子手）、表情/情绪（表情帝）、互动特征（接梗高手）
-
-返回JSON（不要markdown代码块，不要emoji）：
-[
-  {{
-    "name": "用户名",
-    "title": "称号（2-4字）",
-    "reason": "获得理由,引用数据（50-70字）"
-  }}
-]"""
+            prompt = _TITLES_PROMPT_TEMPLATE.format(users_info=users_info, **_PROMPT_PARTS)
 
             # 使用 LLM 生成
-            model_task_config = model_config.model_task_config.replyer
-            success, result, reasoning, model_name = await llm_api.generate_with_model(
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
+            success, result, reasoning, model_name = await ChatAnalysisUtils._generate_cached(
                 prompt=prompt,
                 model_config=model_task_config,
                 request_type="plugin.chat_summary.titles",
@@ -208,80 +686,32 @@ class ChatAnalysisUtils:
     @staticmethod
     async def analyze_golden_quotes(
         messages: List[dict],
-        get_config: Callable = None
+        get_config: Callable = None,
+        quotes_text: Optional[str] = None
     ) -> Optional[List[Dict]]:
         """使用 LLM 提取群聊金句（群圣经）
 
         Args:
             messages: 聊天记录列表
             get_config: 配置获取函数（可选）
+            quotes_text: 预先构建好的金句候选文本（如 scan_messages 的结果），为 None 时从 messages 构建
 
         Returns:
             金句列表，格式: [{content, sender, reason}, ...]
         """
         try:
-            # 提取适合的消息（使用配置的长度范围）
-            interesting_messages = []
-            for msg in messages:
-                nickname = msg.get("user_nickname", "未知用户")
-                cardname = msg.get("user_cardname", "")
-                display_name = cardname if cardname else nickname
-                text = msg.get("processed_plain_text", "")
-                timestamp = msg.get("time", 0)
-                time_str = datetime.fromtimestamp(timestamp).strftime("%H:%M")
-
-                # 清理 @ 提及格式（如 @理理<123456> → 去掉整个提及部分）
-                # 使用正则移除 @用户名<数字> 格式
-                text = re.sub(r'@[^<\s]+<\d+>\s*', '', text)
-                text = text.strip()
-
-                if (AnalysisConfig.MIN_QUOTE_LENGTH <= len(text) <= AnalysisConfig.MAX_QUOTE_LENGTH
-                    and not text.startswith(("http", "www", "/"))):
-                    interesting_messages.append({
-                        "sender": display_name,
-                        "time": time_str,
-                        "content": text
-                    })
-
-            if not interesting_messages:
+            messages_text = quotes_text
+            if messages_text is None:
+                messages_text = ChatAnalysisUtils._build_quotes_messages_text(messages)
+            if not messages_text:
                 return []
 
-            # 构建消息文本
-            messages_text = "\n".join([
-                f"[{msg['time']}] {msg['sender']}: {msg['content']}"
-                for msg in interesting_messages
-            ])
-
             # 构建 prompt
-            prompt = f"""从群聊记录中挑选3-5句最有趣的金句。
-
-优先级（从高到低）：
-1. 神回复、接梗高手（优先选择回复的那句，不是发起的）
-2. 有上下文才有笑点的梗
-3. 精彩吐槽或离谱观点
-4. 高/低情商发言
-
-要求：
-- 每个金句来自不同发言人
-- 避免平淡陈述句、问候语
-- 内容水可以只返回2-3个
-- 理由严格控制在50-70字，说明为什么有趣、回应了什么
-
-群聊记录：
-{messages_text}
-
-返回JSON（不要markdown代码块，不要emoji）：
-[
-  {{
-    "content": "金句原文",
-    "sender": "发言人",
-    "reason": "选择理由（50-70字）"
-  }}
-]"""
+            prompt = _QUOTES_PROMPT_TEMPLATE.format(messages_text=messages_text, **_PROMPT_PARTS)
 
             # 使用 LLM 生成
-            model_task_config = model_config.model_task_config.replyer
-            success, result, reasoning, model_name = await llm_api.generate_with_model(
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
+            success, result, reasoning, model_name = await ChatAnalysisUtils._generate_cached(
                 prompt=prompt,
                 model_config=model_task_config,
                 request_type="plugin.chat_summary.quotes",
@@ -299,11 +729,224 @@ class ChatAnalysisUtils:
             logger.error(f"分析金句失败: {e}", exc_info=True)
             return []
 
+    @staticmethod
+    async def analyze_combined(
+        messages: List[dict],
+        user_stats: Dict,
+        quotes_text: Optional[str] = None,
+        active_users: Optional[Dict] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """用一次 LLM 调用同时生成群友称号和金句
+
+        两个任务共用同一段 prompt 前缀，合并后只需一次网络往返。
+        其中一项没有可分析的数据时，退回到单独的分析方法。
+
+        Args:
+            messages: 聊天记录列表
+            user_stats: 用户统计数据
+            quotes_text: 预先构建好的金句候选文本，为 None 时从 messages 构建
+            active_users: 预先筛选好的活跃用户（可选），为 None 时从 user_stats 筛选
+
+        Returns:
+            (称号列表, 金句列表)
+        """
+        try:
+            users_info = ChatAnalysisUtils._build_titles_users_info(user_stats, active_users)
+            messages_text = quotes_text
+            if messages_text is None:
+                messages_text = ChatAnalysisUtils._build_quotes_messages_text(messages)
+
+            if not users_info and not messages_text:
+                return [], []
+            if not users_info:
+                return [], await ChatAnalysisUtils.analyze_golden_quotes(
+                    messages, quotes_text=messages_text
+                ) or []
+            if not messages_text:
+                return await ChatAnalysisUtils.analyze_user_titles(
+                    user_stats, active_users=active_users
+                ) or [], []
+
+            # 构建 prompt
+            prompt = _TITLES_QUOTES_PROMPT_TEMPLATE.format(
+                users_info=users_info, messages_text=messages_text, **_PROMPT_PARTS
+            )
+
+            # 使用 LLM 生成
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
+            success, result, reasoning, model_name = await ChatAnalysisUtils._generate_cached(
+                prompt=prompt,
+                model_config=model_task_config,
+                request_type="plugin.chat_summary.titles_quotes",
+            )
+
+            if not success:
+                logger.error(f"LLM生成称号和金句失败: {result}")
+                return [], []
+
+            # 解析并分别验证两部分
+            data = ChatAnalysisUtils._parse_llm_json_object(result) or {}
+            titles = data.get("titles")
+            quotes = data.get("quotes")
+            titles = titles if isinstance(titles, list) else []
+            quotes = quotes if isinstance(quotes, list) else []
+
+            return (
+                ChatAnalysisUtils._validate_titles(titles, user_stats),
+                ChatAnalysisUtils._validate_quotes(quotes),
+            )
+
+        except Exception as e:
+            logger.error(f"合并分析称号和金句失败: {e}", exc_info=True)
+            return [], []
+
+    @staticmethod
+    async def _run_with_timeout(coro: Awaitable, task_name: str) -> Any:
+        """带超时地执行单个分析任务
+
+        Args:
+            coro: 分析协程
+            task_name: 任务名称（用于日志）
+
+        Returns:
+            分析结果，超时返回 None
+        """
+        try:
+            return await asyncio.wait_for(coro, timeout=AnalysisConfig.LLM_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning(f"{task_name}分析超时（{AnalysisConfig.LLM_TIMEOUT}秒），已跳过")
+            return None
+
+    @staticmethod
+    async def analyze_all(
+        messages: List[dict],
+        user_stats: Dict,
+        enable_titles: bool = True,
+        enable_quotes: bool = True,
+        quotes_text: Optional[str] = None,
+        active_users: Optional[Dict] = None
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """分析群友称号和金句
+
+        两项都启用时合并为一次 LLM 调用；只启用其中一项时单独调用。
+
+        Args:
+            messages: 聊天记录列表
+            user_stats: 用户统计数据
+            enable_titles: 是否分析群友称号
+            enable_quotes: 是否提取金句
+            quotes_text: 预先构建好的金句候选文本（如 scan_messages 的结果），为 None 时从 messages 构建
+            active_users: 预先筛选好的活跃用户（可选），为 None 时从 user_stats 筛选
+
+        Returns:
+            (称号列表, 金句列表)
+        """
+        if enable_titles and enable_quotes:
+            # 两项都需要时合并为一次 LLM 调用
+            result = await ChatAnalysisUtils._run_with_timeout(
+                ChatAnalysisUtils.analyze_combined(
+                    messages, user_stats, quotes_text, active_users=active_users
+                ),
+                "群友称号和金句"
+            )
+            return result if result else ([], [])
+
+        async def _skip() -> List[Dict]:
+            return []
+
+        titles, quotes = await asyncio.gather(
+            ChatAnalysisUtils._run_with_timeout(
+                ChatAnalysisUtils.analyze_user_titles(user_stats, active_users=active_users), "群友称号"
+            ) if enable_titles else _skip(),
+            ChatAnalysisUtils._run_with_timeout(
+                ChatAnalysisUtils.analyze_golden_quotes(messages, quotes_text=quotes_text), "金句"
+            ) if enable_quotes else _skip(),
+        )
+        return titles or [], quotes or []
+
+    @staticmethod
+    async def run_all_analyses(
+        messages: List[dict],
+        user_stats: Dict,
+        enable_titles: bool = True,
+        enable_quotes: bool = True,
+        enable_depression: bool = True,
+        quotes_text: Optional[str] = None,
+        user_samples: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, List[Dict]]:
+        """并发执行群聊总结所需的全部 LLM 分析（称号、金句、炫压抑指数）
+
+        各项分析之间没有依赖，同时发起请求，总耗时约等于最慢的一项。
+
+        Args:
+            messages: 聊天记录列表
+            user_stats: 用户统计数据
+            enable_titles: 是否分析群友称号
+            enable_quotes: 是否提取金句
+            enable_depression: 是否分析炫压抑指数
+            quotes_text: 预先构建好的金句候选文本，为 None 时从 messages 构建
+            user_samples: 预先收集的每个用户发言样本，为 None 时从 messages 收集
+
+        Returns:
+            {"user_titles": [...], "golden_quotes": [...], "depression_index": [...]}
+        """
+        async def _skip() -> List[Dict]:
+            return []
+
+        # 称号和炫压抑指数共用同一份活跃用户筛选结果
+        active_users = ChatAnalysisUtils.filter_active_users(user_stats)
+
+        (user_titles, golden_quotes), depression_index = await asyncio.gather(
+            ChatAnalysisUtils.analyze_all(
+                messages,
+                user_stats,
+                enable_titles=enable_titles,
+                enable_quotes=enable_quotes,
+                quotes_text=quotes_text,
+                active_users=active_users,
+            ),
+            ChatAnalysisUtils._run_with_timeout(
+                ChatAnalysisUtils.analyze_depression_index(
+                    messages, user_stats, active_users=active_users, user_samples=user_samples
+                ),
+                "炫压抑指数"
+            ) if enable_depression else _skip(),
+        )
+        return {
+            "user_titles": user_titles,
+            "golden_quotes": golden_quotes,
+            "depression_index": depression_index or [],
+        }
+
+    @staticmethod
+    async def analyze_many(
+        jobs: List[Callable[[], Awaitable[Any]]],
+        concurrency: Optional[int] = None
+    ) -> List[Any]:
+        """并发执行多个分析任务（如多个群聊的总结流程），用信号量限制同时进行的数量
+
+        Args:
+            jobs: 任务工厂列表，每个元素调用后返回一个协程；拿到信号量后才创建协程
+            concurrency: 最大并发数，默认使用 AnalysisConfig.LLM_CONCURRENCY
+
+        Returns:
+            与 jobs 顺序一致的结果列表，失败的任务对应位置为异常对象
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or AnalysisConfig.LLM_CONCURRENCY))
+
+        async def _run(job: Callable[[], Awaitable[Any]]) -> Any:
+            async with semaphore:
+                return await job()
+
+        return await asyncio.gather(*(_run(job) for job in jobs), return_exceptions=True)
+
     @staticmethod
     async def analyze_depression_index(
         messages: List[dict],
         user_stats: Dict,
-        get_config: Callable = None
+        get_config: Callable = None,
+        active_users: Optional[Dict] = None,
+        user_samples: Optional[Dict[str, List[str]]] = None
     ) -> Optional[List[Dict]]:
         """使用 LLM 分析群友炫压抑指数
 
@@ -311,37 +954,52 @@ class ChatAnalysisUtils:
             messages: 聊天记录列表
             user_stats: 用户统计数据
             get_config: 配置获取函数（可选）
+            active_users: 预先筛选好的活跃用户（可选），为 None 时从 user_stats 筛选
+            user_samples: 预先收集的每个用户发言样本（如 scan_messages 的结果），为 None 时从 messages 收集
 
         Returns:
             炫压抑指数列表，格式: [{name, user_id, rank, comment}, ...]
         """
         try:
             # 只分析发言 >= 配置的最小发言数的用户
-            active_users = {
-                uid: stats for uid, stats in user_stats.items()
-                if stats["message_count"] >= AnalysisConfig.MIN_MESSAGES_FOR_TITLE
-            }
+            if active_users is None:
+                active_users = ChatAnalysisUtils.filter_active_users(user_stats)
 
             if not active_users:
                 return []
 
             # 提取用户发言内容样本
-            user_messages = {}
-            for msg in messages:
-                user_id = str(msg.get("user_id", ""))
-                if user_id not in active_users:
-                    continue
-
-                text = msg.get("processed_plain_text", "")
-                if len(text) < 5:  # 过滤太短的消息
-                    continue
-
-                if user_id not in user_messages:
-                    user_messages[user_id] = []
-
-                # 每人最多收集20条有效发言
-                if len(user_messages[user_id]) < 20:
-                    user_messages[user_id].append(text)
+            if user_samples is not None:
+                user_messages = {
+                    uid: samples for uid, samples in user_samples.items() if uid in active_users
+                }
+            else:
+                user_messages = {}
+                full_count = 0  # 已收集满 20 条的用户数，全部收集满后不再继续遍历
+                uid_cache = {}  # 原始 user_id -> 字符串形式
+                for msg in messages:
+                    raw_id = msg.get("user_id", "")
+                    user_id = uid_cache.get(raw_id)
+                    if user_id is None:
+                        user_id = uid_cache[raw_id] = str(raw_id)
+                    if user_id not in active_users:
+                        continue
+
+                    text = msg.get("processed_plain_text", "")
+                    if len(text) < 5:  # 过滤太短的消息
+                        continue
+
+                    if user_id not in user_messages:
+                        user_messages[user_id] = []
+
+                    # 每人最多收集20条有效发言
+                    samples = user_messages[user_id]
+                    if len(samples) < 20:
+                        samples.append(text)
+                        if len(samples) == 20:
+                            full_count += 1
+                            if full_count == len(active_users):
+                                break
 
             if not user_messages:
                 return []
@@ -360,9 +1018,6 @@ class ChatAnalysisUtils:
             # 构建 prompt
             prompt = f"""分析群友的"炫压抑"指数（娱乐向）。炫压抑=性欲望强烈但表达受抑制的失衡状态。
 
-用户发言样本：
-{users_info}
-
 评级标准：
 - S级：想色色但欲言又止,或疯狂发涩图/开黄腔(过度补偿)
 - A级：经常想开车但克制扭捏
@@ -379,11 +1034,14 @@ class ChatAnalysisUtils:
     "rank": "S/A/B/C/D",
     "comment": "简短评价"
   }}
-]"""
+]
+
+用户发言样本：
+{users_info}"""
 
             # 使用 LLM 生成
-            model_task_config = model_config.model_task_config.replyer
-            success, result, reasoning, model_name = await llm_api.generate_with_model(
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
+            success, result, reasoning, model_name = await ChatAnalysisUtils._generate_cached(
                 prompt=prompt,
                 model_config=model_task_config,
                 request_type="plugin.chat_summary.depression",
@@ -401,6 +1059,35 @@ class ChatAnalysisUtils:
             logger.error(f"分析炫压抑指数失败: {e}", exc_info=True)
             return []
 
+    @staticmethod
+    def _clip(value: Any, limit: int) -> str:
+        """转换为字符串并限制长度（已经足够短时直接返回，不做切片）
+
+        Args:
+            value: 原始值
+            limit: 最大长度
+
+        Returns:
+            不超过 limit 个字符的字符串
+        """
+        text = value if isinstance(value, str) else str(value)
+        return text if len(text) <= limit else text[:limit]
+
+    @staticmethod
+    def _build_nickname_index(user_stats: Optional[Dict[str, Dict]]) -> Dict[str, str]:
+        """构建 昵称 -> user_id 索引（昵称重复时保留最先出现的用户）
+
+        Args:
+            user_stats: 用户统计数据
+
+        Returns:
+            昵称到 user_id 的映射
+        """
+        nick_index = {}
+        for uid, stats in (user_stats or {}).items():
+            nick_index.setdefault(stats.get("nickname"), uid)
+        return nick_index
+
     @staticmethod
     def _validate_titles(data: List[Dict[str, Any]], user_stats: Dict[str, Dict] = None) -> List[Dict[str, Any]]:
         """验证并清理群友称号数据
@@ -413,30 +1100,29 @@ class ChatAnalysisUtils:
             验证后的数据列表
         """
         validated = []
+        nick_index = ChatAnalysisUtils._build_nickname_index(user_stats)
+        clip = ChatAnalysisUtils._clip
+        max_title = AnalysisConfig.MAX_TITLE_LENGTH
+        max_reason = AnalysisConfig.MAX_REASON_LENGTH
         for item in data:
             if not isinstance(item, dict):
                 continue
 
             # 必需字段
-            if not all(key in item for key in ["name", "title", "reason"]):
+            if not ("name" in item and "title" in item and "reason" in item):
                 logger.warning(f"群友称号数据缺少必需字段: {item}")
                 continue
 
             # 验证数据类型和长度
-            name = str(item["name"])[:50]  # 限制长度
-            title = str(item["title"])[:AnalysisConfig.MAX_TITLE_LENGTH]
-            reason = str(item["reason"])[:AnalysisConfig.MAX_REASON_LENGTH]
+            name = clip(item["name"], 50)  # 限制长度
+            title = clip(item["title"], max_title)
+            reason = clip(item["reason"], max_reason)
 
             if not name or not title or not reason:
                 continue
 
-            # 尝试从 user_stats 中查找匹配的 user_id
-            user_id = ""
-            if user_stats:
-                for uid, stats in user_stats.items():
-                    if stats.get("nickname") == name:
-                        user_id = uid
-                        break
+            # 从 user_stats 中查找匹配的 user_id
+            user_id = nick_index.get(name, "")
 
             validated.append({
                 "name": name,
@@ -458,22 +1144,25 @@ class ChatAnalysisUtils:
             验证后的数据列表
         """
         validated = []
+        clip = ChatAnalysisUtils._clip
+        max_reason = AnalysisConfig.MAX_REASON_LENGTH
         for item in data:
             if not isinstance(item, dict):
                 continue
 
             # 必需字段
-            if not all(key in item for key in ["content", "sender", "reason"]):
+            if not ("content" in item and "sender" in item and "reason" in item):
                 logger.warning(f"金句数据缺少必需字段: {item}")
                 continue
 
             # 验证数据类型和长度
-            content = str(item["content"])[:200]  # 限制长度
-            sender = str(item["sender"])[:50]
-            reason = str(item["reason"])[:AnalysisConfig.MAX_REASON_LENGTH]
+            content = clip(item["content"], 200)  # 限制长度
+            sender = clip(item["sender"], 50)
+            reason = clip(item["reason"], max_reason)
 
             # 清理 @ 提及格式（如 @理理<123456> → 去掉整个提及部分）
-            content = re.sub(r'@[^<\s]+<\d+>\s*', '', content)
+            if '@' in content:
+                content = ChatAnalysisUtils._AT_MENTION_RE.sub('', content)
             content = content.strip()
 
             if not content or not sender or not reason:
@@ -499,19 +1188,21 @@ class ChatAnalysisUtils:
             验证后的数据列表
         """
         validated = []
+        nick_index = ChatAnalysisUtils._build_nickname_index(user_stats)
+        clip = ChatAnalysisUtils._clip
         for item in data:
             if not isinstance(item, dict):
                 continue
 
             # 必需字段
-            if not all(key in item for key in ["name", "rank", "comment"]):
+            if not ("name" in item and "rank" in item and "comment" in item):
                 logger.warning(f"炫压抑指数数据缺少必需字段: {item}")
                 continue
 
             # 验证数据类型和长度
-            name = str(item["name"])[:50]
+            name = clip(item["name"], 50)
             rank = str(item["rank"]).upper().strip()
-            comment = str(item["comment"])[:60]  # 限制评价长度（30字约60字符）
+            comment = clip(item["comment"], 60)  # 限制评价长度（30字约60字符）
 
             # 验证rank是否在S/A/B/C/D中
             if rank not in ["S", "A", "B", "C", "D"]:
@@ -521,13 +1212,8 @@ class ChatAnalysisUtils:
             if not name or not rank or not comment:
                 continue
 
-            # 尝试从 user_stats 中查找匹配的 user_id
-            user_id = ""
-            if user_stats:
-                for uid, stats in user_stats.items():
-                    if stats.get("nickname") == name:
-                        user_id = uid
-                        break
+            # 从 user_stats 中查找匹配的 user_id
+            user_id = nick_index.get(name, "")
 
             validated.append({
                 "name": name,
@@ -579,7 +1265,7 @@ class ChatAnalysisUtils:
 
             for msg in messages:
                 timestamp = msg.get("time", 0)
-                hour = datetime.fromtimestamp(timestamp).hour
+                hour = _hour_of_quarter(timestamp // 900)
                 hours_counter[hour] += 1
 
                 text = msg.get("processed_plain_text", "")
@@ -598,9 +1284,11 @@ class ChatAnalysisUtils:
             chat_sample = "\n".join([f"- {text[:80]}" for text in sample_texts])
 
             # 构建统计信息
-            total_chars = sum(len(text) for text in all_texts)
+            total_chars = sum(map(len, all_texts))
             avg_chars = total_chars / len(all_texts) if all_texts else 0
-            emoji_count = sum(ChatAnalysisUtils.count_emojis(text) for text in all_texts)
+            # 合并后只做一次 emoji 匹配（换行符不属于 emoji，结果与逐条统计相同）
+            joined_text = "\n".join(all_texts)
+            emoji_count = ChatAnalysisUtils.count_emojis(joined_text)
             emoji_ratio = emoji_count / len(all_texts) if all_texts else 0
 
             # 统计时段分布
@@ -614,11 +1302,9 @@ class ChatAnalysisUtils:
             # 计算更多维度的统计
             total_messages = len(messages)
             # 话题关键词（简单统计）
-            words_freq = Counter()
-            for text in all_texts:
-                # 简单分词（按空格和标点）
-                words = re.findall(r'[\u4e00-\u9fff]+|[a-zA-Z]+', text)
-                words_freq.update([w for w in words if len(w) >= 2])
+            # 简单分词（按空格和标点），对合并文本只做一次匹配（换行符不会被匹配，分词结果与逐条相同）
+            words = ChatAnalysisUtils._WORD_RE.findall(joined_text)
+            words_freq = Counter(w for w in words if len(w) >= 2)
             top_words = ', '.join([w for w, _ in words_freq.most_common(5)])
 
             # 互动特征（简单判断）
@@ -628,23 +1314,6 @@ class ChatAnalysisUtils:
             # 构建 prompt
             prompt = f"""分析这个用户的聊天画像（娱乐向，有趣但不失真实）。
 
-用户基础数据：
-- 用户名：{user_name}
-- 发言数：{total_messages}条
-- 平均长度：{avg_chars:.1f}字/条
-- 表情使用：{emoji_ratio:.2f}个/条
-- 提问比例：{question_ratio:.2f}
-
-时间特征：
-- 时段分布：{time_distribution}
-- 最活跃时段：{', '.join([f'{h}点' for h in active_hours_list[:3]])}
-
-内容特征：
-- 高频词：{top_words}
-
-发言样本（最近{len(sample_texts)}条）：
-{chat_sample}
-
 要求：
 1. tags: 1-3个有趣的个性标签（3-6字），基于真实数据，避免陈词滥调
    - 参考维度：时间特征（夜猫子/早起鸟）、表达风格（表情包选手/文字工匠）、互动特征（好奇宝宝/话题终结者）、情绪倾向（开心果/emo精）
@@ -707,11 +1376,28 @@ class ChatAnalysisUtils:
   "mood": "积极/中性/消极",
   "mood_score": 75,
   "mood_reason": "基于表情使用、用词倾向等的评估理由"
-}}"""
+}}
+
+用户基础数据：
+- 用户名：{user_name}
+- 发言数：{total_messages}条
+- 平均长度：{avg_chars:.1f}字/条
+- 表情使用：{emoji_ratio:.2f}个/条
+- 提问比例：{question_ratio:.2f}
+
+时间特征：
+- 时段分布：{time_distribution}
+- 最活跃时段：{', '.join([f'{h}点' for h in active_hours_list[:3]])}
+
+内容特征：
+- 高频词：{top_words}
+
+发言样本（最近{len(sample_texts)}条）：
+{chat_sample}"""
 
             # 使用 LLM 生成
-            model_task_config = model_config.model_task_config.replyer
-            success, result, reasoning, model_name = await llm_api.generate_with_model(
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
+            success, result, reasoning, model_name = await ChatAnalysisUtils._generate_cached(
                 prompt=prompt,
                 model_config=model_task_config,
                 request_type="plugin.chat_summary.user_profile",
@@ -825,6 +1511,64 @@ class ChatAnalysisUtils:
             logger.error(f"验证用户画像数据失败: {e}")
             return None
 
+    @staticmethod
+    def _strip_code_fence(result: str) -> str:
+        """去除 LLM 输出开头的 markdown 代码块标记，只保留第一个代码块的内容
+
+        Args:
+            result: LLM 返回的原始结果
+
+        Returns:
+            去除首尾空白和代码块标记后的文本
+        """
+        result = result.strip()
+        if result.startswith("```"):
+            # 只需找到第一个代码块的结束标记，无需把整段文本按 ``` 全部切开
+            end_idx = result.find("```", 3)
+            result = result[3:end_idx] if end_idx != -1 else result[3:]
+            if result.startswith("json"):
+                result = result[4:]
+        return result.strip()
+
+    @staticmethod
+    def _repair_json(text: str) -> Any:
+        """使用 json-repair 修复并解析格式有误的 JSON（未安装时直接返回 None）
+
+        Args:
+            text: 待解析的文本
+
+        Returns:
+            解析结果，未安装 json-repair 或修复失败时返回 None
+        """
+        if _json_repair_loads is None:
+            return None
+        try:
+            return _json_repair_loads(text)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _load_json_span(result: str, open_char: str, close_char: str) -> Any:
+        """解析从第一个 open_char 开始的 JSON 值
+
+        先用 _json_loads（安装了 orjson 时更快）解析首尾括号之间的部分；失败时（例如 JSON 后的说明文字里
+        也带有括号）再用标准库从第一个括号处解析出一个完整的值，忽略其后的内容。
+
+        Raises:
+            json.JSONDecodeError: 两种方式都无法解析
+        """
+        start_idx = result.find(open_char)
+        if start_idx == -1:
+            return _json_loads(result)
+
+        end_idx = result.rfind(close_char)
+        if end_idx > start_idx:
+            try:
+                return _json_loads(result[start_idx:end_idx + 1])
+            except json.JSONDecodeError:
+                pass
+        return _JSON_DECODER.raw_decode(result, start_idx)[0]
+
     @staticmethod
     def _parse_llm_json_object(result: str) -> Optional[Dict[str, Any]]:
         """解析 LLM 返回的 JSON 对象（非数组）
@@ -837,24 +1581,10 @@ class ChatAnalysisUtils:
         """
         try:
             # 去除可能的 markdown 代码块标记
-            result = result.strip()
-            if result.startswith("```"):
-                parts = result.split("```")
-                if len(parts) >= 2:
-                    result = parts[1]
-                    if result.startswith("json"):
-                        result = result[4:]
-            result = result.strip()
-
-            # 尝试提取JSON对象部分（从第一个 { 到最后一个 }）
-            start_idx = result.find('{')
-            end_idx = result.rfind('}')
-
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                result = result[start_idx:end_idx + 1]
+            result = ChatAnalysisUtils._strip_code_fence(result)
 
-            # 尝试直接解析
-            data = json.loads(result)
+            # 提取第一个 { 到最后一个 } 之间的JSON对象
+            data = ChatAnalysisUtils._load_json_span(result, '{', '}')
 
             # 验证返回的是字典
             if not isinstance(data, dict):
@@ -864,10 +1594,21 @@ class ChatAnalysisUtils:
             return data
 
         except json.JSONDecodeError as e:
+            # 只截取第一个 { 到最后一个 } 之间的部分进行修复
+            start_idx = result.find('{')
+            end_idx = result.rfind('}')
+            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+                result = result[start_idx:end_idx + 1]
+
+            data = ChatAnalysisUtils._repair_json(result)
+            if isinstance(data, dict):
+                logger.info("成功通过 json_repair 解析JSON对象")
+                return data
+
             logger.warning(f"解析 JSON 对象失败: {e}, 尝试清理后重试")
             try:
                 # 移除 emoji
-                result_cleaned = ChatAnalysisUtils.EMOJI_PATTERN.sub('', result)
+                result_cleaned = ChatAnalysisUtils._strip_emojis(result)
 
                 # 再次提取JSON对象部分
                 start_idx = result_cleaned.find('{')
@@ -877,9 +1618,9 @@ class ChatAnalysisUtils:
                     result_cleaned = result_cleaned[start_idx:end_idx + 1]
 
                 # 修复中文字符间的异常空格
-                result_cleaned = re.sub(r'([\u4e00-\u9fff])\s+([\u4e00-\u9fff])', r'\1\2', result_cleaned)
+                result_cleaned = ChatAnalysisUtils._CJK_SPACE_CJK.sub(r'\1\2', result_cleaned)
 
-                data = json.loads(result_cleaned)
+                data = _json_loads(result_cleaned)
 
                 if not isinstance(data, dict):
                     return None
@@ -905,25 +1646,10 @@ class ChatAnalysisUtils:
         """
         try:
             # 去除可能的 markdown 代码块标记
-            result = result.strip()
-            if result.startswith("```"):
-                parts = result.split("```")
-                if len(parts) >= 2:
-                    result = parts[1]
-                    if result.startswith("json"):
-                        result = result[4:]
-            result = result.strip()
-
-            # 尝试提取JSON数组部分（从第一个 [ 到最后一个 ]）
-            # 这可以处理LLM在JSON后添加额外说明文本的情况
-            start_idx = result.find('[')
-            end_idx = result.rfind(']')
-
-            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
-                result = result[start_idx:end_idx + 1]
+            result = ChatAnalysisUtils._strip_code_fence(result)
 
-            # 尝试直接解析
-            data = json.loads(result)
+            # 提取第一个 [ 到最后一个 ] 之间的JSON数组
+            data = ChatAnalysisUtils._load_json_span(result, '[', ']')
 
             # 验证返回的是列表
             if not isinstance(data, list):
@@ -938,12 +1664,23 @@ class ChatAnalysisUtils:
             return data
 
         except json.JSONDecodeError as e:
+            # 只截取第一个 [ 到最后一个 ] 之间的部分进行修复
+            start_idx = result.find('[')
+            end_idx = result.rfind(']')
+            if start_idx != -1 and end_idx != -1 and end_idx > start_idx:
+                result = result[start_idx:end_idx + 1]
+
+            data = ChatAnalysisUtils._repair_json(result)
+            if isinstance(data, list) and all(isinstance(item, dict) for item in data):
+                logger.info("成功通过 json_repair 解析JSON")
+                return data
+
             logger.warning(f"解析 JSON 失败: {e}, 尝试清理emoji和修复格式后重试")
             logger.debug(f"原始LLM输出（前500字符）: {result[:500]}")
             # 只有解析失败时才尝试清理和修复
             try:
                 # 1. 移除emoji
-                result_cleaned = ChatAnalysisUtils.EMOJI_PATTERN.sub('', result)
+                result_cleaned = ChatAnalysisUtils._strip_emojis(result)
 
                 # 2. 再次提取JSON数组部分
                 start_idx = result_cleaned.find('[')
@@ -954,11 +1691,9 @@ class ChatAnalysisUtils:
 
                 # 3. 尝试修复中文字符间的异常空格（可能是emoji清理或LLM输出导致）
                 # 保留JSON结构中的必要空格，只清理中文字符、数字、标点间的多余空格
-                result_cleaned = re.sub(r'([\u4e00-\u9fff])\s+([\u4e00-\u9fff])', r'\1\2', result_cleaned)
-                result_cleaned = re.sub(r'([\u4e00-\u9fff])\s+([\d])', r'\1\2', result_cleaned)
-                result_cleaned = re.sub(r'([\d])\s+([\u4e00-\u9fff])', r'\1\2', result_cleaned)
+                result_cleaned = ChatAnalysisUtils._CJK_DIGIT_SPACE.sub('', result_cleaned)
 
-                data = json.loads(result_cleaned)
+                data = _json_loads(result_cleaned)
 
                 if not isinstance(data, list):
                     logger.warning(f"清理后的数据类型错误: {type(data)}")
@@ -4,25 +4,72 @@
 集中管理所有硬编码的配置项，提高可维护性
 """
 
-from typing import List, Tuple
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 
 
 class FontConfig:
     """字体配置"""
 
-    # 字体路径列表（按优先级排序）
-    FONT_PATHS: List[str] = [
+    # 各平台的候选字体路径（按优先级排序）
+    LINUX_FONT_PATHS: List[str] = [
         "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
         "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
         "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
         "/usr/share/fonts/truetype/noto/NotoSansCJK-Regular.ttc",
         "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-        "/System/Library/Fonts/PingFang.ttc",  # macOS
-        "C:/Windows/Fonts/msyh.ttc",  # Windows
+    ]
+    MACOS_FONT_PATHS: List[str] = [
+        "/System/Library/Fonts/PingFang.ttc",
+    ]
+    WINDOWS_FONT_PATHS: List[str] = [
+        "C:/Windows/Fonts/msyh.ttc",
     ]
 
-
-class ColorScheme:
+    # 字体路径列表（按优先级排序）：当前平台的路径排在最前，其余平台的路径作为兜底
+    if sys.platform == "darwin":
+        FONT_PATHS: List[str] = MACOS_FONT_PATHS + LINUX_FONT_PATHS + WINDOWS_FONT_PATHS
+    elif sys.platform == "win32":
+        FONT_PATHS: List[str] = WINDOWS_FONT_PATHS + LINUX_FONT_PATHS + MACOS_FONT_PATHS
+    else:
+        FONT_PATHS: List[str] = LINUX_FONT_PATHS + MACOS_FONT_PATHS + WINDOWS_FONT_PATHS
+
+    # 已解析出的字体路径（首次调用 resolve 后缓存，避免每次渲染都逐个检查候选路径）
+    _resolved_path: Optional[str] = None
+
+    @classmethod
+    def resolve(cls) -> Optional[str]:
+        """返回第一个存在的字体文件路径，结果在进程内缓存
+
+        Returns:
+            字体文件路径，全部候选路径都不存在时返回 None（不缓存，下次调用重新查找）
+        """
+        path = cls._resolved_path
+        if path is not None and os.path.exists(path):
+            return path
+        for path in cls.FONT_PATHS:
+            if os.path.exists(path):
+                cls._resolved_path = path
+                return path
+        return None
+
+
+def _pack_color(color: Tuple[int, ...]) -> int:
+    """将 RGB/RGBA 颜色打包为 Pillow 可直接使用的 32 位整数颜色
+
+    Pillow 把整数颜色按 ABGR 解释（R 在最低字节），RGB 颜色的 alpha 取 255。
+    """
+    r, g, b = color[:3]
+    a = color[3] if len(color) > 3 else 255
+    return (a << 24) | (b << 16) | (g << 8) | r
+
+
+# 以下配置是只读的单例（frozen + slots 的 dataclass 实例），用法与类属性相同，
+# 但属性访问走 slot 描述符，比在类字典中查找更快
+@dataclass(frozen=True, slots=True)
+class _ColorScheme:
     """配色方案 - 梦幻渐变风格"""
 
     # 背景渐变色
@@ -51,6 +98,15 @@ class ColorScheme:
     LIGHT_TEXT_COLOR: Tuple[int, int, int] = (130, 130, 150)
     HIGHLIGHT_COLOR: Tuple[int, int, int] = (255, 100, 150)
 
+    # 打包为整数的颜色（直接作为绘图 fill 参数，省去每次调用时转换元组）
+    CARD_BG_PACKED: int = _pack_color(CARD_BG)
+    CARD_BG_LIGHT_PACKED: int = _pack_color(CARD_BG_LIGHT)
+    TITLE_COLOR_PACKED: int = _pack_color(TITLE_COLOR)
+    TEXT_COLOR_PACKED: int = _pack_color(TEXT_COLOR)
+    SUBTITLE_COLOR_PACKED: int = _pack_color(SUBTITLE_COLOR)
+    LIGHT_TEXT_COLOR_PACKED: int = _pack_color(LIGHT_TEXT_COLOR)
+    HIGHLIGHT_COLOR_PACKED: int = _pack_color(HIGHLIGHT_COLOR)
+
     # 渐变强调色
     GRADIENT_1_START: Tuple[int, int, int] = (100, 200, 255)
     GRADIENT_1_END: Tuple[int, int, int] = (150, 100, 255)
@@ -62,7 +118,11 @@ class ColorScheme:
     GRADIENT_3_END: Tuple[int, int, int] = (255, 160, 100)
 
 
-class LayoutConfig:
+ColorScheme = _ColorScheme()
+
+
+@dataclass(frozen=True, slots=True)
+class _LayoutConfig:
     """布局配置"""
 
     # 尺寸
@@ -79,7 +139,11 @@ class LayoutConfig:
     SMALL_SIZE: int = 24
 
 
-class DecorationConfig:
+LayoutConfig = _LayoutConfig()
+
+
+@dataclass(frozen=True, slots=True)
+class _DecorationConfig:
     """装饰配置"""
 
     # 相对于插件目录的装饰图片路径
@@ -98,7 +162,11 @@ class DecorationConfig:
     DECORATION_QUOTE: str = "decoration_quote.png"
 
 
-class AnalysisConfig:
+DecorationConfig = _DecorationConfig()
+
+
+@dataclass(frozen=True, slots=True)
+class _AnalysisConfig:
     """分析配置"""
 
     # 用户称号分析
@@ -110,7 +178,18 @@ class AnalysisConfig:
     MAX_QUOTE_LENGTH: int = 100      # 金句最大长度
     MIN_QUOTES: int = 3              # 最少金句数
     MAX_QUOTES: int = 5              # 最多金句数
+    MAX_QUOTE_CONTEXT_CHARS: int = 12000  # 金句候选文本最大字符数（超出时按时间均匀抽样，控制 prompt 长度）
+    MIN_QUOTE_CONTEXT_CHARS: int = 200    # 金句候选文本最少字符数（不足时跳过金句提取，避免 LLM 在过少内容上编造）
+
+    # LLM 调用
+    LLM_TIMEOUT: float = 90.0        # 单次分析调用超时（秒），避免一个慢请求拖住其他分析
+    LLM_CONCURRENCY: int = 3         # 每日总结时同时处理的群聊数上限（控制对 LLM 后端的并发请求）
+    LLM_CACHE_TTL: float = 600.0     # 相同 prompt 的 LLM 结果缓存时间（秒），0 表示不缓存
+    LLM_CACHE_MAX_SIZE: int = 64     # LLM 结果缓存的最大条目数
 
     # JSON 返回验证
     MAX_REASON_LENGTH: int = 100     # 理由最大长度（防止LLM返回过长，控制在70字左右）
     MAX_TITLE_LENGTH: int = 10       # 称号最大长度
+
+
+AnalysisConfig = _AnalysisConfig()
@@ -9,8 +9,12 @@ import base64
 import tempfile
 import aiohttp
 import asyncio
-from typing import Tuple, List, Optional
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, Tuple, List, Optional
 from datetime import datetime
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
 from .constants import FontConfig, ColorScheme, LayoutConfig, DecorationConfig
@@ -24,6 +28,427 @@ except ImportError:
     logger = logging.getLogger("summary_image_generator")
 
 
+@lru_cache(maxsize=32)
+def _load_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    """加载字体并按 (路径, 字号) 缓存，所有渲染共享同一个字体对象
+
+    字体只用于只读的测量和绘制，可以安全复用；加载失败时抛出的异常不会被缓存。
+    """
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=4096)
+def _text_bbox(font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int, int, int]:
+    """测量文字边界框，按 (字体, 文字) 缓存（字体对象由 _load_font 复用，重复的标签、单字只测量一次）"""
+    return font.getbbox(text)
+
+
+def _line_height(font: ImageFont.FreeTypeFont) -> int:
+    """字体的行高（以“测试”两字的边界框高度为准）"""
+    bbox = _text_bbox(font, '测试')
+    return bbox[3] - bbox[1]
+
+
+@lru_cache(maxsize=4096)
+def _char_metrics(font: ImageFont.FreeTypeFont, char: str) -> Tuple[float, int, int]:
+    """返回单个字符的 (前进宽度, 左边界, 右边界)，供换行时逐字累加行宽"""
+    left, _, right, _ = _text_bbox(font, char)
+    return font.getlength(char), left, right
+
+
+@lru_cache(maxsize=64)
+def _decode_decoration(path: str, mtime: float, size: Tuple[int, int], keep_ratio: bool) -> Image.Image:
+    """读取并缩放装饰图片，按 (路径, 修改时间, 尺寸, 缩放方式) 缓存
+
+    修改时间参与缓存键，替换装饰图片文件后会重新读取。返回的图片在多次渲染间共享，调用方不能修改。
+    """
+    deco_img = Image.open(path).convert("RGBA")
+    if not keep_ratio:
+        return deco_img.resize(size, Image.Resampling.LANCZOS)
+
+    w, h = deco_img.size
+    scale = min(size[0] / w, size[1] / h, 1.0)
+    if scale < 1.0:
+        deco_img = deco_img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
+    return deco_img
+
+
+@lru_cache(maxsize=64)
+def _decoration_glow(
+    path: str,
+    mtime: float,
+    max_size: Tuple[int, int],
+    glow_color: Tuple[int, int, int],
+    flip_h: bool = False
+) -> Tuple[Image.Image, int]:
+    """生成装饰图片的柔和光晕层，按 (装饰图片, 光晕颜色, 是否镜像) 缓存
+
+    Returns:
+        (光晕图层, 边距)，图层左上角对应装饰图片位置向左上偏移“边距”像素处
+    """
+    if flip_h:
+        deco_img = _flip_decoration(path, mtime, max_size, True, True, False)
+    else:
+        deco_img = _decode_decoration(path, mtime, max_size, True)
+    new_w, new_h = deco_img.size
+
+    # 光晕向外扩展 15 像素，再留出高斯模糊的扩散范围
+    pad = 15 + 3 * 8
+    glow_layer = Image.new('RGBA', (new_w + pad * 2, new_h + pad * 2), (0, 0, 0, 0))
+
+    # 创建柔和光晕
+    for offset in range(15, 0, -2):
+        alpha = int(40 * (15 - offset) / 15)  # 降低透明度
+        glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
+        glow_temp.paste(deco_img, (offset, offset), deco_img)
+
+        # 添加颜色叠加
+        color_layer = Image.new('RGBA', glow_temp.size, glow_color + (alpha,))
+        glow_temp = Image.alpha_composite(glow_temp, color_layer)
+
+        glow_layer.paste(glow_temp, (pad - offset, pad - offset), glow_temp)
+
+    # 应用模糊
+    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
+    return glow_layer, pad
+
+
+@lru_cache(maxsize=16)
+def _avatar_glow(size: int, glow_color: Tuple[int, int, int], glow_radius: int) -> Tuple[Image.Image, int]:
+    """生成圆形头像的柔和光晕层，按 (头像尺寸, 光晕颜色, 光晕半径) 缓存
+
+    Returns:
+        (光晕图层, 边距)，图层左上角对应头像位置向左上偏移“边距”像素处
+    """
+    # 光晕向外扩展 glow_radius 像素，再留出高斯模糊的扩散范围
+    pad = glow_radius + 3 * (glow_radius // 2)
+    glow_layer = Image.new('RGBA', (size + pad * 2, size + pad * 2), (0, 0, 0, 0))
+    for offset in range(glow_radius, 0, -1):
+        alpha = int(50 * (glow_radius - offset) / glow_radius)
+        glow_size = size + offset * 2
+        glow_temp = Image.new('RGBA', (glow_size, glow_size), (0, 0, 0, 0))
+
+        # 创建光晕圆形
+        glow_mask = Image.new('L', (glow_size, glow_size), 0)
+        glow_mask_draw = ImageDraw.Draw(glow_mask)
+        glow_mask_draw.ellipse((0, 0, glow_size, glow_size), fill=255)
+
+        # 应用颜色
+        glow_colored = Image.new('RGBA', (glow_size, glow_size), glow_color + (alpha,))
+        glow_temp.paste(glow_colored, (0, 0), glow_mask)
+
+        # 粘贴到光晕层
+        glow_layer.paste(glow_temp, (pad - offset, pad - offset), glow_temp)
+
+    # 模糊光晕
+    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=glow_radius // 2))
+    return glow_layer, pad
+
+
+def _decoration_mtime(path: str) -> Optional[float]:
+    """返回装饰图片的修改时间（装饰图片缓存键的一部分），文件不存在时返回 None
+
+    一次 stat 同时完成存在性检查和缓存键计算。
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _flip_decoration(
+    path: str, mtime: float, size: Tuple[int, int], keep_ratio: bool, flip_h: bool, flip_v: bool
+) -> Image.Image:
+    """返回翻转后的装饰图片，按 (缩放参数, 翻转方式) 缓存（卡片四角、标题两侧的镜像装饰每次渲染都会用到）"""
+    deco_img = _decode_decoration(path, mtime, size, keep_ratio)
+    if flip_h:
+        deco_img = deco_img.transpose(Image.FLIP_LEFT_RIGHT)
+    if flip_v:
+        deco_img = deco_img.transpose(Image.FLIP_TOP_BOTTOM)
+    return deco_img
+
+
+@lru_cache(maxsize=32)
+def _rainbow_border_palette(border_color: Tuple[int, int, int]) -> np.ndarray:
+    """预先计算卡片彩虹边框的颜色表，按主色调缓存（配色中只有少数几种边框颜色）
+
+    Returns:
+        形状为 (100, 3) 的 uint8 数组，第 i 行为边框第 i 段（共 100 段）的 RGB 颜色
+    """
+    # 定义彩虹色序列（基于主色调变化）
+    rainbow_colors = np.array([
+        border_color,  # 主色
+        tuple(min(255, c + 40) for c in border_color),  # 亮一点
+        (border_color[2], border_color[0], border_color[1]),  # 色相旋转
+        (border_color[1], border_color[2], border_color[0]),  # 色相旋转
+        border_color,  # 回到主色
+    ], dtype=np.float64)
+    count = len(rainbow_colors)
+
+    idx = np.arange(100)
+    color_idx = (idx * count) // 100
+    next_color_idx = (color_idx + 1) % count
+    local_ratio = ((idx * count) % 100) / 100
+
+    # 颜色插值
+    start = rainbow_colors[color_idx]
+    palette = (start + (rainbow_colors[next_color_idx] - start) * local_ratio[:, None]).astype(np.uint8)
+    palette.flags.writeable = False
+    return palette
+
+
+# 发言分布图各时间段柱子的渐变色 (起始色, 结束色)，按 hour // 6 索引
+_HOURLY_BAR_COLORS = (
+    ((120, 100, 200), (80, 60, 160)),   # 深夜 - 深蓝紫
+    ((255, 200, 100), (255, 160, 80)),  # 早晨 - 橙黄
+    ((100, 200, 255), (80, 160, 220)),  # 下午 - 青蓝
+    ((255, 150, 200), (220, 100, 180)),  # 晚上 - 粉紫
+)
+
+
+@lru_cache(maxsize=128)
+def _hourly_bar(
+    width: int,
+    height: int,
+    start_color: Tuple[int, int, int],
+    end_color: Tuple[int, int, int],
+    corner_radius: int
+) -> Tuple[Image.Image, Image.Image]:
+    """生成发言分布图中的一根渐变圆角柱子
+
+    颜色从底部的 start_color 渐变到顶部的 end_color，透明度 240；靠近底部 corner_radius 行按圆角裁剪
+    （只覆盖 width 列），其余各行覆盖 width + 1 列。
+
+    Returns:
+        (柱子图片, 蒙版)，均为 height 行、width + 1 列，蒙版为 255 的像素属于柱子
+    """
+    # 第 row 行距离柱子底部 i = height - 1 - row 行
+    i = np.arange(height - 1, -1, -1)[:, None]
+    ratio = i / max(1, height)
+    start = np.array(start_color, dtype=np.float64)
+    colors = (start + (np.array(end_color, dtype=np.float64) - start) * ratio).astype(np.uint8)
+
+    pixels = np.empty((height, width + 1, 4), dtype=np.uint8)
+    pixels[..., :3] = colors[:, None, :]
+    pixels[..., 3] = 240
+
+    # 圆角区域：左右两端到圆心的距离超过半径的像素不绘制
+    px = np.arange(width + 1)[None, :]
+    dy2 = (i - corner_radius) ** 2
+    radius2 = corner_radius * corner_radius
+    left = px < corner_radius
+    right = ~left & (px >= width - corner_radius)
+    inside = np.where(
+        left,
+        (px - corner_radius) ** 2 + dy2 <= radius2,
+        np.where(right, (px - (width - corner_radius)) ** 2 + dy2 <= radius2, True)
+    ) & (px < width)
+    mask = np.where((i < corner_radius) & ~inside, 0, 255).astype(np.uint8)
+
+    return Image.fromarray(pixels), Image.fromarray(mask)
+
+
+@lru_cache(maxsize=32)
+def _card_shadow(width: int, height: int, radius: int, strength: int) -> Tuple[Image.Image, int]:
+    """生成卡片外围的柔和阴影层
+
+    阴影是围绕卡片（右下偏移 2 像素）的一圈渐变：紧贴卡片处透明度最高，向外 strength 像素内逐渐减弱到 0，
+    再整体做一次高斯模糊。透明度由每个像素到圆角矩形的距离一次算出，不再逐圈绘制圆角矩形。
+
+    Returns:
+        (阴影图层, 边距)，图层左上角对应卡片阴影矩形左上角向外偏移“边距”像素的位置
+    """
+    blur_radius = strength // 2
+    pad = strength + 3 * blur_radius + 2
+
+    # 各像素到圆角矩形 (0, 0, width, height) 的距离（矩形内部为负）
+    xs = np.arange(-pad, width + pad + 1)[None, :]
+    ys = np.arange(-pad, height + pad + 1)[:, None]
+    dx = np.maximum(np.maximum(radius - xs, xs - (width - radius)), 0)
+    dy = np.maximum(np.maximum(radius - ys, ys - (height - radius)), 0)
+    distance = np.hypot(dx, dy) - radius
+
+    # 距离落在第 i 圈（i-1 < d <= i）的像素透明度为 30 * (strength - i) / strength，紧贴边缘的一圈按第 1 圈算
+    ring = np.maximum(np.ceil(distance), 1).astype(np.int64)
+    ramp = (30 * (strength - np.arange(strength + 2)) // max(1, strength)).clip(0)
+    alpha = ramp[np.minimum(ring, strength + 1)]
+    alpha[distance <= -1] = 0
+
+    mask = Image.fromarray(alpha.astype(np.uint8))
+    mask = mask.filter(ImageFilter.GaussianBlur(radius=blur_radius))
+    shadow = Image.new('RGBA', mask.size, (100, 100, 120, 0))
+    shadow.putalpha(mask)
+    return shadow, pad
+
+
+@lru_cache(maxsize=16)
+def _divider_layer(width: int, padding: int) -> Tuple[Image.Image, int]:
+    """生成装饰性分隔线图层（彩虹渐变线条 + 中心装饰点）
+
+    Returns:
+        (分隔线图层, 分隔线在图层中的 y 坐标)
+    """
+    top = 8  # 装饰点光晕半径
+    divider_layer = Image.new('RGBA', (width, top * 2 + 1), (0, 0, 0, 0))
+    divider_draw = ImageDraw.Draw(divider_layer)
+
+    x1 = padding
+    x2 = width - padding
+    center_x = width // 2
+
+    # 绘制渐变线条（从两端向中间：透明 -> 彩色 -> 透明），线宽 2 像素，覆盖 x1..x2 列
+    length = x2 - x1
+    if length > 0:
+        ratio = np.arange(length) / length
+        # 计算透明度（中间高，两端低）
+        alpha = 180 * (1 - np.abs(2 * ratio - 1))
+
+        # 彩色渐变（彩虹色），按色相分 6 段插值
+        hue = (ratio * 360) % 360
+        segments = [hue < 60, hue < 120, hue < 180, hue < 240, hue < 300]
+        r = np.select(segments, [255, 255 - (hue - 60) * 4.25, 150, 180, 200 + (hue - 240) * 0.9], 255)
+        g = np.select(segments, [hue * 4.25, 255, 255, 255 - (hue - 180) * 2, 150], 160)
+        b = np.select(segments, [180, 200, 200 + (hue - 120) * 0.9, 255, 255], 255 - (hue - 300) * 1.25)
+
+        colors = np.stack([r, g, b, alpha], axis=-1).astype(np.uint8)
+        colors = np.concatenate([colors, colors[-1:]])  # 最后一段线条多覆盖一列
+        pixels = np.ascontiguousarray(np.broadcast_to(colors[None, :, :], (2, length + 1, 4)))
+        divider_layer.paste(Image.fromarray(pixels), (x1, top))
+
+    # 添加中心装饰点
+    dot_colors = [
+        (255, 200, 220, 200),  # 粉
+        (200, 220, 255, 200),  # 蓝
+        (220, 200, 255, 200),  # 紫
+    ]
+    dot_positions = [center_x - 20, center_x, center_x + 20]
+    for i, pos in enumerate(dot_positions):
+        color = dot_colors[i % len(dot_colors)]
+        # 外圈光晕
+        for r in range(8, 0, -1):
+            alpha = int(color[3] * (8 - r) / 8 * 0.3)
+            divider_draw.ellipse(
+                [pos - r, top - r, pos + r, top + r],
+                fill=color[:3] + (alpha,)
+            )
+        # 实心点
+        divider_draw.ellipse(
+            [pos - 4, top - 4, pos + 4, top + 4],
+            fill=color
+        )
+
+    return divider_layer, top
+
+
+@lru_cache(maxsize=64)
+def _rounded_mask(width: int, height: int, radius: int) -> Image.Image:
+    """卡片背景的圆角蒙版，覆盖 (0, 0, width, height)，按卡片尺寸缓存（同一次渲染中多张卡片尺寸相同）"""
+    mask = Image.new('L', (width + 1, height + 1), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, width, height), radius=radius, fill=255)
+    return mask
+
+
+@lru_cache(maxsize=16)
+def _circle_mask(size: int) -> Image.Image:
+    """圆形头像的蒙版，按头像尺寸缓存（每张卡片的头像尺寸相同）"""
+    mask = Image.new('L', (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    return mask
+
+
+@lru_cache(maxsize=64)
+def _border_ring_mask(width: int, height: int, radius: int) -> Image.Image:
+    """卡片彩虹边框的环形蒙版（外扩 2 像素的外圆角减去内缩 4 像素的内圆角），左上角对应卡片左上角外 2 像素处"""
+    mask = Image.new('L', (width + 5, height + 5), 0)
+    mask_draw = ImageDraw.Draw(mask)
+    mask_draw.rounded_rectangle((0, 0, width + 4, height + 4), radius=radius + 2, fill=255)
+    mask_draw.rounded_rectangle((6, 6, width - 2, height - 2), radius=radius - 4, fill=0)
+    return mask
+
+
+def _composite_overlay(img: Image.Image, overlay: Image.Image):
+    """把与 img 同尺寸的图层就地混合到 img 上，只处理图层中有内容（不透明度非 0）的区域"""
+    bbox = overlay.getbbox()
+    if bbox:
+        img.alpha_composite(overlay, bbox[:2], bbox)
+
+
+def _alpha_composite_at(img: Image.Image, layer: Image.Image, dest: Tuple[int, int]):
+    """把 layer 就地混合到 img 的 dest 位置，超出 img 边界的部分自动裁掉"""
+    x, y = dest
+    left, top = max(0, -x), max(0, -y)
+    right = min(layer.width, img.width - x)
+    bottom = min(layer.height, img.height - y)
+    if left < right and top < bottom:
+        img.alpha_composite(layer, (x + left, y + top), (left, top, right, bottom))
+
+
+def _paste_composite(img: Image.Image, src: Image.Image, dest: Tuple[int, int]):
+    """把 src 以自身为蒙版贴到 img 的 dest 位置
+
+    结果与“在 img 同尺寸的透明图层上 paste(src, dest, src) 后整体 alpha_composite”一致，
+    但只分配和混合 src 大小的图层。
+    """
+    layer = Image.new('RGBA', src.size, (0, 0, 0, 0))
+    layer.paste(src, (0, 0), src)
+    _alpha_composite_at(img, layer, dest)
+
+
+@lru_cache(maxsize=64)
+def _linear_gradient(length: int, start_color: tuple, end_color: tuple) -> np.ndarray:
+    """计算线性渐变的颜色序列，按 (长度, 起止颜色) 缓存（徽章、称号卡片的渐变色只有少数几组）
+
+    Returns:
+        形状为 (length, 3) 的只读 uint8 数组，第 i 个颜色为 start + (end - start) * i / length 取整
+    """
+    start = np.array(start_color[:3])
+    end = np.array(end_color[:3])
+    ratio = np.arange(length)[:, None] / max(1, length)
+    colors = (start + (end - start) * ratio).astype(np.uint8)
+    colors.flags.writeable = False
+    return colors
+
+
+@lru_cache(maxsize=64)
+def _card_gradient_column(height: int) -> np.ndarray:
+    """计算卡片背景三段渐变每一行的颜色（顶部 30% 淡蓝紫过渡到白色，中部纯白，底部 30% 过渡到淡粉）
+
+    Returns:
+        形状为 (height, 3) 的 uint8 数组，与逐行插值后取整的结果一致
+    """
+    ratio = np.arange(height) / height
+    top = ratio < 0.3
+    bottom = ratio >= 0.7
+    top_progress = ratio / 0.3
+    bottom_progress = (ratio - 0.7) / 0.3
+    r = np.where(top, 252 + 3 * top_progress, 255)
+    g = np.select([top, bottom], [250 + 5 * top_progress, 255 - 3 * bottom_progress], 255)
+    b = np.where(bottom, 255 - 2 * bottom_progress, 255)
+    column = np.stack([r, g, b], axis=-1).astype(np.uint8)
+    column.flags.writeable = False
+    return column
+
+
+@lru_cache(maxsize=32)
+def _background_gradient_column(height: int) -> np.ndarray:
+    """计算背景渐变每一行的颜色（上半部分 BG_START→BG_MID，下半部分 BG_MID→BG_END）
+
+    Returns:
+        形状为 (height, 4) 的 uint8 数组（RGBA，不透明），颜色与逐行插值后取整的结果一致
+    """
+    half = height // 2
+    ys = np.arange(height, dtype=np.float64)
+    upper = (ys < half)[:, None]
+    ratio = np.where(upper[:, 0], ys, ys - half)[:, None] / half
+    start = np.where(upper, ColorScheme.BG_START, ColorScheme.BG_MID)
+    end = np.where(upper, ColorScheme.BG_MID, ColorScheme.BG_END)
+    column = np.full((height, 4), 255, dtype=np.uint8)
+    column[:, :3] = start + (end - start) * ratio
+    column.flags.writeable = False
+    return column
+
+
 class SummaryImageGenerator:
     """生成聊天总结图片 - 梦幻渐变风格"""
 
@@ -65,16 +490,52 @@ class SummaryImageGenerator:
 
     @staticmethod
     def _get_font(size: int) -> ImageFont.FreeTypeFont:
-        """获取字体"""
+        """获取字体（优先使用已解析的字体路径，同一字号的字体只加载一次）"""
+        path = FontConfig.resolve()
+        if path is not None:
+            try:
+                return _load_font(path, size)
+            except Exception:
+                pass
+
+        # 已解析的字体无法加载时，逐个尝试其余候选字体
         for path in FontConfig.FONT_PATHS:
             if os.path.exists(path):
                 try:
-                    return ImageFont.truetype(path, size)
+                    return _load_font(path, size)
                 except Exception:
                     continue
 
         raise RuntimeError("未找到可用的中文字体")
 
+    @staticmethod
+    def _load_decoration(
+        path: str,
+        size: Tuple[int, int],
+        keep_ratio: bool = True,
+        flip_h: bool = False,
+        flip_v: bool = False,
+        mtime: Optional[float] = None
+    ) -> Image.Image:
+        """获取缩放（及翻转）后的装饰图片（同一图片、尺寸和翻转方式只处理一次）
+
+        Args:
+            path: 装饰图片路径
+            size: keep_ratio 为 True 时是最大尺寸（只缩小不放大），否则为目标尺寸
+            keep_ratio: 是否保持宽高比
+            flip_h: 是否水平翻转
+            flip_v: 是否垂直翻转
+            mtime: 图片的修改时间（调用方已通过 _decoration_mtime 取得时传入，省去重复 stat）
+
+        Returns:
+            RGBA 装饰图片（共享的缓存对象，不要原地修改）
+        """
+        if mtime is None:
+            mtime = os.stat(path).st_mtime
+        if flip_h or flip_v:
+            return _flip_decoration(path, mtime, tuple(size), keep_ratio, flip_h, flip_v)
+        return _decode_decoration(path, mtime, tuple(size), keep_ratio)
+
     @staticmethod
     async def _download_qq_avatar(qq_id: str, size: int = 100) -> Optional[Image.Image]:
         """下载QQ用户头像
@@ -102,6 +563,24 @@ class SummaryImageGenerator:
 
         return None
 
+    @staticmethod
+    async def _prefetch_avatars(
+        requests: List[Tuple[str, int]]
+    ) -> Dict[Tuple[str, int], Optional[Image.Image]]:
+        """并发下载多个QQ头像
+
+        Args:
+            requests: (QQ号, 尺寸) 列表，QQ号为空的会被跳过，重复的只下载一次
+
+        Returns:
+            {(QQ号, 尺寸): 头像图片}，下载失败的为 None
+        """
+        keys = list(dict.fromkeys(key for key in requests if key[0]))
+        results = await asyncio.gather(
+            *(SummaryImageGenerator._download_qq_avatar(qq_id, size=size) for qq_id, size in keys)
+        )
+        return dict(zip(keys, results))
+
     @staticmethod
     def _create_circular_avatar(avatar: Image.Image, size: int) -> Image.Image:
         """将头像裁剪为圆形
@@ -116,15 +595,10 @@ class SummaryImageGenerator:
         # 调整大小
         avatar = avatar.resize((size, size), Image.Resampling.LANCZOS)
 
-        # 创建圆形蒙版
-        mask = Image.new('L', (size, size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse((0, 0, size, size), fill=255)
-
-        # 应用蒙版
+        # 应用圆形蒙版（蒙版按尺寸缓存）
         output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
         output.paste(avatar, (0, 0))
-        output.putalpha(mask)
+        output.putalpha(_circle_mask(size))
 
         return output
 
@@ -135,66 +609,31 @@ class SummaryImageGenerator:
         position: Tuple[int, int],
         glow_color: Tuple[int, int, int],
         glow_radius: int = 8
-    ) -> Image.Image:
+    ) -> None:
         """添加带光晕效果的圆形头像
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             avatar: 圆形头像
             position: 粘贴位置 (x, y)
             glow_color: 光晕颜色 RGB
             glow_radius: 光晕半径
-
-        Returns:
-            添加头像后的图片
         """
         size = avatar.size[0]
 
-        # 创建光晕层
-        glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        for offset in range(glow_radius, 0, -1):
-            alpha = int(50 * (glow_radius - offset) / glow_radius)
-            glow_size = size + offset * 2
-            glow_temp = Image.new('RGBA', (glow_size, glow_size), (0, 0, 0, 0))
-
-            # 创建光晕圆形
-            glow_mask = Image.new('L', (glow_size, glow_size), 0)
-            glow_mask_draw = ImageDraw.Draw(glow_mask)
-            glow_mask_draw.ellipse((0, 0, glow_size, glow_size), fill=255)
-
-            # 应用颜色
-            glow_colored = Image.new('RGBA', (glow_size, glow_size), glow_color + (alpha,))
-            glow_temp.paste(glow_colored, (0, 0), glow_mask)
-
-            # 粘贴到光晕层
-            glow_x = position[0] - offset
-            glow_y = position[1] - offset
-            glow_layer.paste(glow_temp, (glow_x, glow_y), glow_temp)
-
-        # 模糊光晕
-        glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=glow_radius // 2))
-
-        # 合成光晕
-        img = Image.alpha_composite(img, glow_layer)
+        # 合成光晕（光晕只在头像周围的小画布上生成，按尺寸和颜色缓存）
+        glow_layer, pad = _avatar_glow(size, tuple(glow_color), glow_radius)
+        _alpha_composite_at(img, glow_layer, (position[0] - pad, position[1] - pad))
 
         # 添加白色边框
         border_size = size + 6
-        border_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        border_layer = Image.new('RGBA', (border_size + 1, border_size + 1), (0, 0, 0, 0))
         border_draw = ImageDraw.Draw(border_layer)
-        border_x = position[0] - 3
-        border_y = position[1] - 3
-        border_draw.ellipse(
-            (border_x, border_y, border_x + border_size, border_y + border_size),
-            fill=(255, 255, 255, 200)
-        )
-        img = Image.alpha_composite(img, border_layer)
+        border_draw.ellipse((0, 0, border_size, border_size), fill=(255, 255, 255, 200))
+        _alpha_composite_at(img, border_layer, (position[0] - 3, position[1] - 3))
 
         # 粘贴头像
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        overlay.paste(avatar, position, avatar)
-        img = Image.alpha_composite(img, overlay)
-
-        return img
+        _paste_composite(img, avatar, position)
 
     @staticmethod
     def _draw_rounded_rectangle(
@@ -205,29 +644,8 @@ class SummaryImageGenerator:
         outline: tuple = None,
         width: int = 1
     ):
-        """绘制圆角矩形"""
-        x1, y1, x2, y2 = coords
-
-        # 绘制主体矩形
-        draw.rectangle([x1 + radius, y1, x2 - radius, y2], fill=fill)
-        draw.rectangle([x1, y1 + radius, x2, y2 - radius], fill=fill)
-
-        # 四个圆角
-        draw.pieslice([x1, y1, x1 + radius * 2, y1 + radius * 2], 180, 270, fill=fill)
-        draw.pieslice([x2 - radius * 2, y1, x2, y1 + radius * 2], 270, 360, fill=fill)
-        draw.pieslice([x1, y2 - radius * 2, x1 + radius * 2, y2], 90, 180, fill=fill)
-        draw.pieslice([x2 - radius * 2, y2 - radius * 2, x2, y2], 0, 90, fill=fill)
-
-        # 绘制边框
-        if outline:
-            draw.arc([x1, y1, x1 + radius * 2, y1 + radius * 2], 180, 270, fill=outline, width=width)
-            draw.arc([x2 - radius * 2, y1, x2, y1 + radius * 2], 270, 360, fill=outline, width=width)
-            draw.arc([x1, y2 - radius * 2, x1 + radius * 2, y2], 90, 180, fill=outline, width=width)
-            draw.arc([x2 - radius * 2, y2 - radius * 2, x2, y2], 0, 90, fill=outline, width=width)
-            draw.line([x1 + radius, y1, x2 - radius, y1], fill=outline, width=width)
-            draw.line([x1 + radius, y2, x2 - radius, y2], fill=outline, width=width)
-            draw.line([x1, y1 + radius, x1, y2 - radius], fill=outline, width=width)
-            draw.line([x2, y1 + radius, x2, y2 - radius], fill=outline, width=width)
+        """绘制圆角矩形（一次调用 Pillow 原生的圆角矩形绘制）"""
+        draw.rounded_rectangle(coords, radius=radius, fill=fill, outline=outline, width=width)
 
     @staticmethod
     def _wrap_text(text: str, max_width: int, font: ImageFont.FreeTypeFont) -> List[str]:
@@ -239,51 +657,52 @@ class SummaryImageGenerator:
                 lines.append('')
                 continue
 
-            current_line = ''
-            for char in paragraph:
-                test_line = current_line + char
-                bbox = font.getbbox(test_line)
-                w = bbox[2] - bbox[0]
-
-                if w <= max_width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        lines.append(current_line)
-                    current_line = char
-
-            if current_line:
-                lines.append(current_line)
+            # 第 i..j 个字符组成一行时的宽度 = 第 i..j-1 个字符的前进宽度之和 + 第 j 个字符的右边界 - 第 i 个字符的左边界，
+            # 与测量整行边界框的结果一致。line_end[j] 为前 j 个字符的前进宽度 + 第 j 个字符的右边界（取前缀最大值，单调不减），
+            # 这样每行的断点只需一次二分查找，不必逐字判断
+            metrics = [_char_metrics(font, char) for char in paragraph]
+            offsets = [0.0, *accumulate(m[0] for m in metrics)]
+            line_end = list(accumulate(
+                (offset + m[2] for offset, m in zip(offsets, metrics)),
+                max
+            ))
+
+            start = 0
+            length = len(paragraph)
+            while start < length:
+                # 每行至少包含一个字符，从下一个字符开始找第一个放不下的位置
+                limit = max_width + offsets[start] + metrics[start][1]
+                end = bisect_right(line_end, limit, start + 1)
+                lines.append(paragraph[start:end])
+                start = end
 
         return lines
 
     @staticmethod
-    def _draw_gradient_rect(
-        draw: ImageDraw.ImageDraw,
+    def _paste_gradient_rect(
+        img: Image.Image,
         coords: tuple,
         start_color: tuple,
         end_color: tuple,
         horizontal: bool = True
     ):
-        """绘制渐变矩形"""
+        """绘制渐变矩形（用 numpy 一次算出整个矩形的像素后粘贴到 img 上）
+
+        覆盖范围与逐列/逐行画线一致：水平渐变为 x1..x2-1 列、y1..y2 行，垂直渐变为 y1..y2-1 行、x1..x2 列。
+        """
         x1, y1, x2, y2 = coords
 
         if horizontal:
             # 水平渐变
-            for x in range(x1, x2):
-                ratio = (x - x1) / max(1, (x2 - x1))
-                r = int(start_color[0] + (end_color[0] - start_color[0]) * ratio)
-                g = int(start_color[1] + (end_color[1] - start_color[1]) * ratio)
-                b = int(start_color[2] + (end_color[2] - start_color[2]) * ratio)
-                draw.line([(x, y1), (x, y2)], fill=(r, g, b))
+            colors = _linear_gradient(x2 - x1, start_color, end_color)
+            pixels = np.broadcast_to(colors[None, :, :], (y2 - y1 + 1, x2 - x1, 3))
         else:
             # 垂直渐变
-            for y in range(y1, y2):
-                ratio = (y - y1) / max(1, (y2 - y1))
-                r = int(start_color[0] + (end_color[0] - start_color[0]) * ratio)
-                g = int(start_color[1] + (end_color[1] - start_color[1]) * ratio)
-                b = int(start_color[2] + (end_color[2] - start_color[2]) * ratio)
-                draw.line([(x1, y), (x2, y)], fill=(r, g, b))
+            colors = _linear_gradient(y2 - y1, start_color, end_color)
+            pixels = np.broadcast_to(colors[:, None, :], (y2 - y1, x2 - x1 + 1, 3))
+
+        if pixels.size:
+            img.paste(Image.fromarray(np.ascontiguousarray(pixels)), (x1, y1))
 
     @staticmethod
     def _draw_colorful_card(
@@ -294,11 +713,11 @@ class SummaryImageGenerator:
         shadow_strength: int = 15,
         use_gradient_bg: bool = True,
         use_rainbow_border: bool = True
-    ) -> Image.Image:
+    ) -> None:
         """绘制彩色卡片（适合明亮背景）- 升级版：渐变背景 + 彩虹边框
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             coords: 卡片坐标 (x1, y1, x2, y2)
             border_color: 边框颜色（用于确定主色调）
             radius: 圆角半径
@@ -308,158 +727,75 @@ class SummaryImageGenerator:
         """
         x1, y1, x2, y2 = coords
 
-        # 创建RGBA图层
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-
-        # 绘制柔和阴影效果（从外到内）
-        for i in range(shadow_strength, 0, -1):
-            alpha = int(30 * (shadow_strength - i) / shadow_strength)
-            shadow_color = (100, 100, 120, alpha)
-            offset = i
+        # 绘制柔和阴影效果（阴影层只覆盖卡片周围区域，按卡片尺寸缓存）
+        shadow, pad = _card_shadow(x2 - x1, y2 - y1, radius, shadow_strength)
+        _alpha_composite_at(img, shadow, (x1 + 2 - pad, y1 + 2 - pad))
 
-            SummaryImageGenerator._draw_rounded_rectangle(
-                overlay_draw,
-                (x1 - offset + 2, y1 - offset + 2, x2 + offset + 2, y2 + offset + 2),
-                radius + offset,
-                fill=(0, 0, 0, 0),
-                outline=shadow_color,
-                width=2
-            )
-
-        # 应用模糊
-        overlay = overlay.filter(ImageFilter.GaussianBlur(radius=shadow_strength // 2))
-
-        # 合并到主图
-        img = img.convert('RGBA')
-        img = Image.alpha_composite(img, overlay)
-
-        # 绘制卡片背景 - 微妙渐变效果
+        # 绘制卡片背景 - 微妙渐变效果（背景层和蒙版只覆盖卡片区域，混合到原图对应位置）
+        card_width = x2 - x1
+        card_height = y2 - y1
+        card_coords = (0, 0, card_width, card_height)
         if use_gradient_bg:
             # 创建渐变背景（从顶部到底部：淡蓝紫 -> 纯白 -> 淡粉）
-            bg_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            card_height = y2 - y1
-
-            for i in range(card_height):
-                ratio = i / card_height
-                # 三段渐变
-                if ratio < 0.3:
-                    # 顶部：淡蓝紫
-                    progress = ratio / 0.3
-                    r = int(252 + (255 - 252) * progress)
-                    g = int(250 + (255 - 250) * progress)
-                    b = int(255)
-                    alpha = 250
-                elif ratio < 0.7:
-                    # 中部：纯白
-                    r, g, b = 255, 255, 255
-                    alpha = 250
-                else:
-                    # 底部：淡粉
-                    progress = (ratio - 0.7) / 0.3
-                    r = int(255)
-                    g = int(255 - 3 * progress)
-                    b = int(255 - 2 * progress)
-                    alpha = 250
-
-                # 只在卡片区域内绘制
-                overlay_line = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                overlay_line_draw = ImageDraw.Draw(overlay_line)
-                overlay_line_draw.line([(x1, y1 + i), (x2, y1 + i)], fill=(r, g, b, alpha))
-                bg_layer = Image.alpha_composite(bg_layer, overlay_line)
-
-            # 应用圆角蒙版
-            mask = Image.new('L', img.size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            SummaryImageGenerator._draw_rounded_rectangle(
-                mask_draw,
-                coords,
-                radius,
-                fill=255
-            )
-            bg_layer.putalpha(mask)
-            img = Image.alpha_composite(img, bg_layer)
+            bg_layer = Image.new('RGBA', (card_width + 1, card_height + 1), (0, 0, 0, 0))
+
+            # 三段渐变（顶部淡蓝紫 -> 中部纯白 -> 底部淡粉），按行算好颜色后一次粘贴到卡片区域
+            # （透明度随后由圆角蒙版整体替换）
+            column = _card_gradient_column(card_height)
+            rows = np.broadcast_to(column[:, None, :], (card_height, card_width + 1, 3))
+            if rows.size:
+                bg_layer.paste(Image.fromarray(np.ascontiguousarray(rows)), (0, 0))
+
+            # 应用圆角蒙版（按卡片尺寸缓存）
+            bg_layer.putalpha(_rounded_mask(card_width, card_height, radius))
+            _alpha_composite_at(img, bg_layer, (x1, y1))
         else:
             # 使用纯色背景
-            overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+            overlay = Image.new('RGBA', (card_width + 1, card_height + 1), (0, 0, 0, 0))
             overlay_draw = ImageDraw.Draw(overlay)
             SummaryImageGenerator._draw_rounded_rectangle(
                 overlay_draw,
-                coords,
+                card_coords,
                 radius,
-                fill=SummaryImageGenerator.CARD_BG
+                fill=ColorScheme.CARD_BG_PACKED
             )
-            img = Image.alpha_composite(img, overlay)
+            _alpha_composite_at(img, overlay, (x1, y1))
 
         # 绘制边框 - 彩虹渐变或单色
         if use_rainbow_border:
             # 彩虹渐变边框（沿着轮廓变化颜色）
-            border_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            border_draw = ImageDraw.Draw(border_layer)
-
-            # 定义彩虹色序列（基于主色调变化）
-            rainbow_colors = [
-                border_color,  # 主色
-                tuple(min(255, c + 40) for c in border_color),  # 亮一点
-                (border_color[2], border_color[0], border_color[1]),  # 色相旋转
-                (border_color[1], border_color[2], border_color[0]),  # 色相旋转
-                border_color,  # 回到主色
-            ]
-
-            # 绘制多层渐变边框
+            # 沿矩形轮廓取 100 个点，各层向内收缩一个像素，整体写入像素数组
+            # （透明度随后由边框蒙版整体替换，这里只需要颜色）
             border_width = 4
+            palette = _rainbow_border_palette(tuple(border_color))
+            step = 2 * (card_width + card_height) // 100  # 分100段
+            offset = np.arange(100) * step
+
+            # 各段落在哪条边上（顶边 -> 右边 -> 底边 -> 左边）
+            on_top = offset < card_width
+            on_right = ~on_top & (offset < card_width + card_height)
+            on_bottom = ~on_top & ~on_right & (offset < 2 * card_width + card_height)
+            edges = [on_top, on_right, on_bottom]
+
+            # 边框图层只覆盖卡片外扩 2 像素的区域，坐标相对于 (x1 - 2, y1 - 2)
+            pixels = np.zeros((card_height + 5, card_width + 5, 4), dtype=np.uint8)
             for layer in range(border_width):
-                alpha = 255 - layer * 30
-                perimeter = 2 * (x2 - x1 + y2 - y1)
-                step = perimeter // 100  # 分100段
-
-                for i in range(100):
-                    # 计算当前位置
-                    color_idx = (i * len(rainbow_colors)) // 100
-                    next_color_idx = (color_idx + 1) % len(rainbow_colors)
-                    local_ratio = ((i * len(rainbow_colors)) % 100) / 100
-
-                    # 颜色插值
-                    r = int(rainbow_colors[color_idx][0] + (rainbow_colors[next_color_idx][0] - rainbow_colors[color_idx][0]) * local_ratio)
-                    g = int(rainbow_colors[color_idx][1] + (rainbow_colors[next_color_idx][1] - rainbow_colors[color_idx][1]) * local_ratio)
-                    b = int(rainbow_colors[color_idx][2] + (rainbow_colors[next_color_idx][2] - rainbow_colors[color_idx][2]) * local_ratio)
-
-                    color = (r, g, b, alpha)
-
-                    # 计算边框上的坐标（沿着矩形轮廓）
-                    if i * step < (x2 - x1):  # 顶边
-                        px = x1 + i * step
-                        py = y1 + layer
-                    elif i * step < (x2 - x1 + y2 - y1):  # 右边
-                        px = x2 - layer
-                        py = y1 + (i * step - (x2 - x1))
-                    elif i * step < (2 * (x2 - x1) + y2 - y1):  # 底边
-                        px = x2 - (i * step - (x2 - x1 + y2 - y1))
-                        py = y2 - layer
-                    else:  # 左边
-                        px = x1 + layer
-                        py = y2 - (i * step - (2 * (x2 - x1) + y2 - y1))
-
-                    border_draw.point((px, py), fill=color)
-
-            # 应用圆角蒙版
-            mask = Image.new('L', img.size, 0)
-            mask_draw = ImageDraw.Draw(mask)
-            # 边框区域蒙版（外圆角 - 内圆角）
-            SummaryImageGenerator._draw_rounded_rectangle(
-                mask_draw,
-                (x1 - 2, y1 - 2, x2 + 2, y2 + 2),
-                radius + 2,
-                fill=255
-            )
-            SummaryImageGenerator._draw_rounded_rectangle(
-                mask_draw,
-                (x1 + 4, y1 + 4, x2 - 4, y2 - 4),
-                radius - 4,
-                fill=0
-            )
-            border_layer.putalpha(mask)
-            img = Image.alpha_composite(img, border_layer)
+                px = np.select(edges, [
+                    offset,
+                    card_width - layer,
+                    card_width - (offset - (card_width + card_height)),
+                ], layer)
+                py = np.select(edges, [
+                    layer,
+                    offset - card_width,
+                    card_height - layer,
+                ], card_height - (offset - (2 * card_width + card_height)))
+                pixels[py + 2, px + 2, :3] = palette
+            border_layer = Image.fromarray(pixels)
+
+            # 应用圆角蒙版（外圆角 - 内圆角，按卡片尺寸缓存）
+            border_layer.putalpha(_border_ring_mask(card_width, card_height, radius))
+            _alpha_composite_at(img, border_layer, (x1 - 2, y1 - 2))
         else:
             # 单色边框
             overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
@@ -473,9 +809,7 @@ class SummaryImageGenerator:
                 outline=border_rgba,
                 width=4
             )
-            img = Image.alpha_composite(img, overlay)
-
-        return img
+            _composite_overlay(img, overlay)
 
     @staticmethod
     def _draw_text_with_shadow(
@@ -505,41 +839,43 @@ class SummaryImageGenerator:
         text_color: tuple,
         outline_color: tuple = None,
         shadow_radius: int = 6
-    ) -> Image.Image:
+    ) -> None:
         """绘制彩色描边文字（明亮风格）"""
-        # 创建临时图层
-        shadow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        shadow_draw = ImageDraw.Draw(shadow_layer)
+        # 文字和描边只在文字边界框（外扩描边宽度和模糊范围）内的小图层上绘制，坐标相对于图层左上角
+        x, y = position
+        left, top, right, bottom = _text_bbox(font, text)
 
-        # 如果有描边颜色，绘制柔和描边
+        # 如果有描边颜色，绘制柔和描边（由外到内逐层加深，每层用 FreeType 描边一次绘制）
         if outline_color:
+            pad = shadow_radius + 3 * (shadow_radius // 3) + 1
+            origin_x, origin_y = x + left - pad, y + top - pad
+            shadow_layer = Image.new(
+                'RGBA', (right - left + pad * 2, bottom - top + pad * 2), (0, 0, 0, 0)
+            )
+            shadow_draw = ImageDraw.Draw(shadow_layer)
             for offset in range(shadow_radius, 0, -1):
                 alpha = int(80 * (shadow_radius - offset) / shadow_radius)
                 outline_col = outline_color[:3] + (alpha,)
-                for dx in range(-offset, offset + 1):
-                    for dy in range(-offset, offset + 1):
-                        if dx*dx + dy*dy <= offset*offset:
-                            shadow_draw.text(
-                                (position[0] + dx, position[1] + dy),
-                                text,
-                                fill=outline_col,
-                                font=font
-                            )
+                shadow_draw.text(
+                    (x - origin_x, y - origin_y),
+                    text,
+                    fill=outline_col,
+                    font=font,
+                    stroke_width=offset,
+                    stroke_fill=outline_col
+                )
 
             # 应用轻微模糊
             shadow_layer = shadow_layer.filter(ImageFilter.GaussianBlur(radius=shadow_radius // 3))
 
             # 合并阴影
-            img = img.convert('RGBA')
-            img = Image.alpha_composite(img, shadow_layer)
+            _alpha_composite_at(img, shadow_layer, (origin_x, origin_y))
 
         # 绘制主文字
-        text_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        text_layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
         text_draw = ImageDraw.Draw(text_layer)
-        text_draw.text(position, text, fill=text_color, font=font)
-        img = Image.alpha_composite(img, text_layer)
-
-        return img
+        text_draw.text((-left, -top), text, fill=text_color, font=font)
+        _alpha_composite_at(img, text_layer, (x + left, y + top))
 
     @staticmethod
     def _add_decoration_with_glow(
@@ -547,60 +883,40 @@ class SummaryImageGenerator:
         deco_path: str,
         position: tuple,
         max_size: tuple,
-        glow_color: tuple = None
-    ) -> Image.Image:
+        glow_color: tuple = None,
+        flip_h: bool = False
+    ) -> None:
         """添加带发光效果的装饰图片
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             deco_path: 装饰图片路径
             position: 位置 (x, y)
             max_size: 最大尺寸 (width, height)
             glow_color: 发光颜色（可选）
+            flip_h: 是否水平镜像（标题右侧的对称装饰）
         """
-        if not os.path.exists(deco_path):
-            return img
+        mtime = _decoration_mtime(deco_path)
+        if mtime is None:
+            return
 
         try:
-            deco_img = Image.open(deco_path).convert("RGBA")
-            w, h = deco_img.size
+            # 缩放到最大尺寸以内（缩放及翻转结果已缓存）
+            deco_img = SummaryImageGenerator._load_decoration(deco_path, max_size, flip_h=flip_h, mtime=mtime)
+            x, y = position
 
-            # 缩放
-            scale = min(max_size[0] / w, max_size[1] / h, 1.0)
-            new_w, new_h = int(w * scale), int(h * scale)
-            if scale < 1.0:
-                deco_img = deco_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-            # 如果有光晕颜色，添加柔和光晕效果
+            # 如果有光晕颜色，添加柔和光晕效果（光晕只在装饰图片周围的小画布上生成，已缓存）
             if glow_color:
-                glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-
-                # 创建柔和光晕
-                for offset in range(15, 0, -2):
-                    alpha = int(40 * (15 - offset) / 15)  # 降低透明度
-                    glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
-                    glow_temp.paste(deco_img, (offset, offset), deco_img)
-
-                    # 添加颜色叠加
-                    color_layer = Image.new('RGBA', glow_temp.size, glow_color + (alpha,))
-                    glow_temp = Image.alpha_composite(glow_temp, color_layer)
-
-                    glow_layer.paste(glow_temp, (position[0] - offset, position[1] - offset), glow_temp)
-
-                # 应用模糊
-                glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
-                img = Image.alpha_composite(img, glow_layer)
+                glow_layer, pad = _decoration_glow(
+                    deco_path, mtime, tuple(max_size), tuple(glow_color), flip_h
+                )
+                _alpha_composite_at(img, glow_layer, (x - pad, y - pad))
 
             # 粘贴装饰图片
-            overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            overlay.paste(deco_img, position, deco_img)
-            img = Image.alpha_composite(img, overlay)
-
-            return img
+            _paste_composite(img, deco_img, (x, y))
 
         except Exception as e:
             logger.error(f"添加装饰失败 {deco_path}: {e}")
-            return img
 
     @staticmethod
     def _draw_gradient_badge(
@@ -611,43 +927,33 @@ class SummaryImageGenerator:
         font: ImageFont.FreeTypeFont,
         gradient_start: tuple,
         gradient_end: tuple
-    ) -> Image.Image:
+    ) -> None:
         """绘制渐变徽章"""
         x, y = position
         w, h = size
 
-        # 创建临时图层
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
+        # 创建临时图层（只覆盖徽章区域，坐标相对于徽章左上角）
+        overlay = Image.new('RGBA', (w + 1, h + 1), (0, 0, 0, 0))
 
         # 绘制渐变背景
-        SummaryImageGenerator._draw_gradient_rect(
-            overlay_draw,
-            (x, y, x + w, y + h),
+        SummaryImageGenerator._paste_gradient_rect(
+            overlay,
+            (0, 0, w, h),
             gradient_start,
             gradient_end,
             horizontal=True
         )
 
-        # 圆角蒙版
-        mask = Image.new('L', img.size, 0)
-        mask_draw = ImageDraw.Draw(mask)
-        SummaryImageGenerator._draw_rounded_rectangle(
-            mask_draw,
-            (x, y, x + w, y + h),
-            h // 2,
-            fill=255
-        )
-        overlay.putalpha(mask)
+        # 圆角蒙版（按尺寸缓存）
+        overlay.putalpha(_rounded_mask(w, h, h // 2))
 
         # 合并
-        img = img.convert('RGBA')
-        img = Image.alpha_composite(img, overlay)
+        _alpha_composite_at(img, overlay, (x, y))
 
         # 绘制文字
         text_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
         text_draw = ImageDraw.Draw(text_layer)
-        text_bbox = font.getbbox(text)
+        text_bbox = _text_bbox(font, text)
         text_w = text_bbox[2] - text_bbox[0]
         text_h = text_bbox[3] - text_bbox[1]
         text_x = x + (w - text_w) // 2
@@ -657,9 +963,7 @@ class SummaryImageGenerator:
         text_draw.text((text_x + 2, text_y + 2), text, fill=(0, 0, 0, 200), font=font)
         text_draw.text((text_x, text_y), text, fill=(255, 255, 255, 255), font=font)
 
-        img = Image.alpha_composite(img, text_layer)
-
-        return img
+        _composite_overlay(img, text_layer)
 
     @staticmethod
     def _draw_decorative_divider(
@@ -667,74 +971,18 @@ class SummaryImageGenerator:
         y_position: int,
         width: int,
         padding: int = 60
-    ) -> Image.Image:
+    ) -> None:
         """绘制装饰性分隔线 - 带渐变和装饰点
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             y_position: 分隔线Y坐标
             width: 图片宽度
             padding: 左右边距
         """
-        divider_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        divider_draw = ImageDraw.Draw(divider_layer)
-
-        x1 = padding
-        x2 = width - padding
-        center_x = width // 2
-
-        # 绘制渐变线条（从两端向中间：透明 -> 彩色 -> 透明）
-        for i in range(x2 - x1):
-            ratio = i / (x2 - x1)
-            # 计算透明度（中间高，两端低）
-            alpha = int(180 * (1 - abs(2 * ratio - 1)))
-
-            # 彩色渐变（彩虹色）
-            hue = (ratio * 360) % 360
-            if hue < 60:
-                r, g, b = 255, int(hue * 4.25), 180
-            elif hue < 120:
-                r, g, b = int(255 - (hue - 60) * 4.25), 255, 200
-            elif hue < 180:
-                r, g, b = 150, 255, int(200 + (hue - 120) * 0.9)
-            elif hue < 240:
-                r, g, b = 180, int(255 - (hue - 180) * 2), 255
-            elif hue < 300:
-                r, g, b = int(200 + (hue - 240) * 0.9), 150, 255
-            else:
-                r, g, b = 255, 160, int(255 - (hue - 300) * 1.25)
-
-            divider_draw.line(
-                [(x1 + i, y_position), (x1 + i + 1, y_position)],
-                fill=(r, g, b, alpha),
-                width=2
-            )
-
-        # 添加中心装饰点
-        dot_colors = [
-            (255, 200, 220, 200),  # 粉
-            (200, 220, 255, 200),  # 蓝
-            (220, 200, 255, 200),  # 紫
-        ]
-        dot_positions = [center_x - 20, center_x, center_x + 20]
-        for i, pos in enumerate(dot_positions):
-            color = dot_colors[i % len(dot_colors)]
-            # 外圈光晕
-            for r in range(8, 0, -1):
-                alpha = int(color[3] * (8 - r) / 8 * 0.3)
-                divider_draw.ellipse(
-                    [pos - r, y_position - r, pos + r, y_position + r],
-                    fill=color[:3] + (alpha,)
-                )
-            # 实心点
-            divider_draw.ellipse(
-                [pos - 4, y_position - 4, pos + 4, y_position + 4],
-                fill=color
-            )
-
-        img = img.convert('RGBA')
-        img = Image.alpha_composite(img, divider_layer)
-        return img
+        # 分隔线只与宽度和边距有关，整条分隔线（含装饰点）按宽度缓存，只需混合到对应高度
+        divider_layer, top = _divider_layer(width, padding)
+        _alpha_composite_at(img, divider_layer, (0, y_position - top))
 
     @staticmethod
     def _add_corner_decorations(
@@ -742,48 +990,51 @@ class SummaryImageGenerator:
         card_rect: tuple,
         corner_path: str,
         color: tuple = None
-    ) -> Image.Image:
+    ) -> None:
         """在卡片四角添加装饰
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             card_rect: 卡片矩形 (x1, y1, x2, y2)
             corner_path: 角落装饰图片路径
             color: 装饰颜色（可选）
         """
-        if not os.path.exists(corner_path):
-            return img
+        mtime = _decoration_mtime(corner_path)
+        if mtime is None:
+            return
 
         try:
-            corner_img = Image.open(corner_path).convert("RGBA")
-            # 缩放到合适大小
+            # 缩放到合适大小（缩放结果已缓存）
             size = 25
-            corner_img = corner_img.resize((size, size), Image.Resampling.LANCZOS)
+            corner_img = SummaryImageGenerator._load_decoration(
+                corner_path, (size, size), keep_ratio=False, mtime=mtime
+            )
 
             x1, y1, x2, y2 = card_rect
-            overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
 
             # 左上角
-            overlay.paste(corner_img, (x1 + 10, y1 + 10), corner_img)
+            _paste_composite(img, corner_img, (x1 + 10, y1 + 10))
 
-            # 右上角（水平翻转）
-            corner_flip_h = corner_img.transpose(Image.FLIP_LEFT_RIGHT)
-            overlay.paste(corner_flip_h, (x2 - size - 10, y1 + 10), corner_flip_h)
+            # 右上角（水平翻转，翻转结果已缓存，下同）
+            corner_flip_h = SummaryImageGenerator._load_decoration(
+                corner_path, (size, size), keep_ratio=False, flip_h=True, mtime=mtime
+            )
+            _paste_composite(img, corner_flip_h, (x2 - size - 10, y1 + 10))
 
             # 左下角（垂直翻转）
-            corner_flip_v = corner_img.transpose(Image.FLIP_TOP_BOTTOM)
-            overlay.paste(corner_flip_v, (x1 + 10, y2 - size - 10), corner_flip_v)
+            corner_flip_v = SummaryImageGenerator._load_decoration(
+                corner_path, (size, size), keep_ratio=False, flip_v=True, mtime=mtime
+            )
+            _paste_composite(img, corner_flip_v, (x1 + 10, y2 - size - 10))
 
             # 右下角（水平+垂直翻转）
-            corner_flip_both = corner_img.transpose(Image.FLIP_LEFT_RIGHT).transpose(Image.FLIP_TOP_BOTTOM)
-            overlay.paste(corner_flip_both, (x2 - size - 10, y2 - size - 10), corner_flip_both)
-
-            img = Image.alpha_composite(img, overlay)
-            return img
+            corner_flip_both = SummaryImageGenerator._load_decoration(
+                corner_path, (size, size), keep_ratio=False, flip_h=True, flip_v=True, mtime=mtime
+            )
+            _paste_composite(img, corner_flip_both, (x2 - size - 10, y2 - size - 10))
 
         except Exception as e:
             logger.error(f"添加角落装饰失败: {e}")
-            return img
 
     # 已删除未使用的方法: _add_scattered_background_decorations
     # 已删除未使用的方法: _draw_stat_badge
@@ -794,17 +1045,14 @@ class SummaryImageGenerator:
         coords: tuple,
         hourly_data: dict,
         font: ImageFont.FreeTypeFont
-    ) -> Image.Image:
+    ) -> None:
         """绘制24小时发言分布柱状图（带数值标签的圆角柱子）
 
         Args:
-            img: 目标图片
+            img: 目标图片（就地绘制）
             coords: 图表区域坐标 (x1, y1, x2, y2)
             hourly_data: 24小时发言数据 {hour: count}
             font: 字体
-
-        Returns:
-            绘制后的图片
         """
         x1, y1, x2, y2 = coords
         chart_width = x2 - x1
@@ -830,71 +1078,30 @@ class SummaryImageGenerator:
         value_label_space = 40  # 顶部预留空间显示数值
         available_height = chart_height - label_height - value_label_space - 20
 
+        # 一次算出所有柱子的高度和位置（柱子高度至少 3 像素，便于看到圆角）
+        counts = np.fromiter((hourly_data.get(hour, 0) for hour in range(bar_count)), dtype=np.int64, count=bar_count)
+        bar_heights = np.maximum(3, (available_height * counts / max_count).astype(np.int64))
+        bar_xs = x1 + np.arange(bar_count) * (bar_width + bar_spacing)
+        bar_ys = y1 + value_label_space + available_height - bar_heights
+
+        # 圆角半径
+        corner_radius = min(bar_width // 2, 8)
+
         # 绘制每个柱子
-        for hour in range(24):
-            count = hourly_data.get(hour, 0)
-
-            # 计算柱子高度（至少显示3像素，便于看到圆角）
-            bar_height = max(3, int(available_height * count / max_count)) if max_count > 0 else 3
-
-            # 计算柱子位置
-            bar_x = x1 + hour * (bar_width + bar_spacing)
-            bar_y = y1 + value_label_space + available_height - bar_height
-
-            # 渐变色彩 - 根据时间段选择颜色
-            if 0 <= hour < 6:  # 深夜 - 深蓝紫
-                color_start = (120, 100, 200)
-                color_end = (80, 60, 160)
-            elif 6 <= hour < 12:  # 早晨 - 橙黄
-                color_start = (255, 200, 100)
-                color_end = (255, 160, 80)
-            elif 12 <= hour < 18:  # 下午 - 青蓝
-                color_start = (100, 200, 255)
-                color_end = (80, 160, 220)
-            else:  # 晚上 - 粉紫
-                color_start = (255, 150, 200)
-                color_end = (220, 100, 180)
-
-            # 圆角半径
-            corner_radius = min(bar_width // 2, 8)
-
-            # 创建柱子的渐变填充
-            # 先绘制矩形主体
-            for i in range(bar_height):
-                ratio = i / max(1, bar_height)
-                r = int(color_start[0] + (color_end[0] - color_start[0]) * ratio)
-                g = int(color_start[1] + (color_end[1] - color_start[1]) * ratio)
-                b = int(color_start[2] + (color_end[2] - color_start[2]) * ratio)
-
-                line_y = bar_y + bar_height - i - 1
-
-                # 如果在顶部圆角区域，使用圆角绘制
-                if i < corner_radius:
-                    # 计算圆角裁剪
-                    for px in range(bar_width):
-                        # 检查是否在圆角范围内
-                        left_corner_dist = ((px - corner_radius) ** 2 + (i - corner_radius) ** 2) ** 0.5
-                        right_corner_dist = ((px - (bar_width - corner_radius)) ** 2 + (i - corner_radius) ** 2) ** 0.5
-
-                        if px < corner_radius:  # 左上角
-                            if left_corner_dist <= corner_radius:
-                                chart_draw.point((bar_x + px, line_y), fill=(r, g, b, 240))
-                        elif px >= bar_width - corner_radius:  # 右上角
-                            if right_corner_dist <= corner_radius:
-                                chart_draw.point((bar_x + px, line_y), fill=(r, g, b, 240))
-                        else:  # 中间部分
-                            chart_draw.point((bar_x + px, line_y), fill=(r, g, b, 240))
-                else:
-                    # 非圆角部分，直接绘制线条
-                    chart_draw.line(
-                        [(bar_x, line_y), (bar_x + bar_width, line_y)],
-                        fill=(r, g, b, 240)
-                    )
+        for hour, count, bar_x, bar_y, bar_height in zip(
+            range(bar_count), counts.tolist(), bar_xs.tolist(), bar_ys.tolist(), bar_heights.tolist()
+        ):
+            # 渐变色彩 - 根据时间段（每 6 小时一段）选择颜色
+            color_start, color_end = _HOURLY_BAR_COLORS[hour // 6]
+
+            # 整根柱子（渐变填充 + 圆角裁剪）一次粘贴到图层上，蒙版外的像素保持不变
+            bar_img, bar_mask = _hourly_bar(bar_width, bar_height, color_start, color_end, corner_radius)
+            chart_layer.paste(bar_img, (bar_x, bar_y), bar_mask)
 
             # 在柱子顶部显示消息数量（只显示大于0的）
             if count > 0:
                 count_text = str(count)
-                count_bbox = font.getbbox(count_text)
+                count_bbox = _text_bbox(font, count_text)
                 count_w = count_bbox[2] - count_bbox[0]
                 count_h = count_bbox[3] - count_bbox[1]
 
@@ -921,7 +1128,7 @@ class SummaryImageGenerator:
             # 绘制时间标签（每4小时显示一次）
             if hour % 4 == 0:
                 label_text = f"{hour:02d}"
-                label_bbox = font.getbbox(label_text)
+                label_bbox = _text_bbox(font, label_text)
                 label_w = label_bbox[2] - label_bbox[0]
                 label_x = bar_x + (bar_width - label_w) // 2
                 label_y = y1 + value_label_space + available_height + 10
@@ -929,14 +1136,12 @@ class SummaryImageGenerator:
                 chart_draw.text(
                     (label_x, label_y),
                     label_text,
-                    fill=SummaryImageGenerator.LIGHT_TEXT_COLOR + (255,),
+                    fill=ColorScheme.LIGHT_TEXT_COLOR_PACKED,
                     font=font
                 )
 
         # 合并图层
-        img = Image.alpha_composite(img, chart_layer)
-
-        return img
+        _composite_overlay(img, chart_layer)
 
     @staticmethod
     async def generate_summary_image(
@@ -967,6 +1172,55 @@ class SummaryImageGenerator:
             hourly_distribution: 24小时发言分布数据 {hour: count}
             user_profile: 单个用户画像数据 {tags, active_time, fun_score, fun_comment, topic_leadership, topic_comment, rank_title, rank_desc, mood, mood_score, mood_reason}
 
+        Returns:
+            str: 临时图片文件的绝对路径
+        """
+        # 先并发下载图片中用到的所有头像，再在线程中完成纯 CPU 的绘制，避免阻塞事件循环
+        avatar_requests = []
+        for item in (user_titles or [])[:4]:
+            avatar_requests.append((item.get("user_id", ""), 640))
+        for item in (depression_index or [])[:4]:
+            avatar_requests.append((item.get("user_id", ""), 640))
+        if user_profile:
+            avatar_requests.append((user_profile.get("user_id", ""), 140))
+        avatars = await SummaryImageGenerator._prefetch_avatars(avatar_requests)
+
+        return await asyncio.to_thread(
+            SummaryImageGenerator._render_summary_image,
+            title,
+            summary_text,
+            time_info,
+            message_count,
+            participant_count,
+            width,
+            user_titles,
+            golden_quotes,
+            depression_index,
+            hourly_distribution,
+            user_profile,
+            avatars
+        )
+
+    @staticmethod
+    def _render_summary_image(
+        title: str,
+        summary_text: str,
+        time_info: str,
+        message_count: int,
+        participant_count: int,
+        width: Optional[int],
+        user_titles: Optional[list],
+        golden_quotes: Optional[list],
+        depression_index: Optional[list],
+        hourly_distribution: Optional[dict],
+        user_profile: Optional[dict],
+        avatars: Dict[Tuple[str, int], Optional[Image.Image]]
+    ) -> str:
+        """同步绘制总结图片并保存（在工作线程中运行），参数同 generate_summary_image
+
+        Args:
+            avatars: 预先下载好的头像 {(QQ号, 尺寸): 头像图片}，下载失败的为 None
+
         Returns:
             str: 临时图片文件的绝对路径
         """
@@ -988,6 +1242,11 @@ class SummaryImageGenerator:
         font_text = SummaryImageGenerator._get_font(SummaryImageGenerator.TEXT_SIZE)
         font_small = SummaryImageGenerator._get_font(SummaryImageGenerator.SMALL_SIZE)
 
+        # 各字号的行高（以“测试”的边界框高度为准），测量和绘制阶段共用
+        text_line_height = _line_height(font_text)
+        small_line_height = _line_height(font_small)
+        subtitle_line_height = _line_height(font_subtitle)
+
         # 获取插件根目录（core的父目录）
         plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -1021,7 +1280,7 @@ class SummaryImageGenerator:
         # 计算总结卡片高度（优化行间距从15到18）
         max_text_width = width - SummaryImageGenerator.PADDING * 2 - SummaryImageGenerator.CARD_PADDING * 2
         wrapped_lines = SummaryImageGenerator._wrap_text(summary_text, max_text_width, font_text)
-        line_height = font_text.getbbox('测试')[3] - font_text.getbbox('测试')[1]
+        line_height = text_line_height
         # 总结卡片区域 = 分隔线40 + 卡片本身 + 间距50
         card_content_height = SummaryImageGenerator.CARD_PADDING * 2 + len(wrapped_lines) * (line_height + 18) + 80
         summary_card_height = 40 + card_content_height + 50
@@ -1030,8 +1289,8 @@ class SummaryImageGenerator:
         if user_titles:
             titles_section_height = 190  # 分隔线40 + 标题区150
             max_reason_width = width - SummaryImageGenerator.PADDING * 2 - SummaryImageGenerator.CARD_PADDING * 2
-            reason_line_height = font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]
-            title_line_height = font_subtitle.getbbox('测试')[3] - font_subtitle.getbbox('测试')[1]
+            reason_line_height = small_line_height
+            title_line_height = subtitle_line_height
             for title_item in user_titles[:4]:  # 显示4个
                 reason = title_item.get("reason", "")
                 reason_lines = SummaryImageGenerator._wrap_text(reason, max_reason_width, font_small)
@@ -1044,13 +1303,16 @@ class SummaryImageGenerator:
         if golden_quotes:
             quotes_section_height = 190  # 分隔线40 + 标题区150
             max_quote_width = width - SummaryImageGenerator.PADDING * 2 - SummaryImageGenerator.CARD_PADDING * 2
-            reason_line_height = font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]
+            reason_line_height = small_line_height
+            # 金句卡片的宽度在绘制阶段不变，换行结果直接留给绘制阶段使用
+            quotes_wrapped = []
             for quote_item in golden_quotes[:4]:  # 显示4个
                 content = quote_item.get("content", "")
                 reason = quote_item.get("reason", "")
                 quote_text = f'"{content}"'
                 quote_lines = SummaryImageGenerator._wrap_text(quote_text, max_quote_width, font_text)
                 reason_lines = SummaryImageGenerator._wrap_text(reason, max_quote_width, font_small)
+                quotes_wrapped.append((quote_lines, reason_lines))
                 card_height = 50 + len(quote_lines) * (line_height + 12) + 50 + len(reason_lines) * (reason_line_height + 8) + 40
                 card_height = max(card_height, 200)
                 quotes_section_height += card_height + SummaryImageGenerator.CARD_SPACING
@@ -1068,83 +1330,80 @@ class SummaryImageGenerator:
         total_height = header_height + hourly_chart_height + summary_card_height + titles_section_height + quotes_section_height + depression_index_height + user_profile_height + footer_height
 
         # ===== 创建图片 =====
-        img = Image.new('RGB', (width, total_height), SummaryImageGenerator.BG_START)
-        draw = ImageDraw.Draw(img)
-
-        # 绘制渐变背景
-        for y in range(total_height):
-            if y < total_height // 2:
-                ratio = y / (total_height // 2)
-                r = int(SummaryImageGenerator.BG_START[0] + (SummaryImageGenerator.BG_MID[0] - SummaryImageGenerator.BG_START[0]) * ratio)
-                g = int(SummaryImageGenerator.BG_START[1] + (SummaryImageGenerator.BG_MID[1] - SummaryImageGenerator.BG_START[1]) * ratio)
-                b = int(SummaryImageGenerator.BG_START[2] + (SummaryImageGenerator.BG_MID[2] - SummaryImageGenerator.BG_START[2]) * ratio)
-            else:
-                ratio = (y - total_height // 2) / (total_height // 2)
-                r = int(SummaryImageGenerator.BG_MID[0] + (SummaryImageGenerator.BG_END[0] - SummaryImageGenerator.BG_MID[0]) * ratio)
-                g = int(SummaryImageGenerator.BG_MID[1] + (SummaryImageGenerator.BG_END[1] - SummaryImageGenerator.BG_MID[1]) * ratio)
-                b = int(SummaryImageGenerator.BG_MID[2] + (SummaryImageGenerator.BG_END[2] - SummaryImageGenerator.BG_MID[2]) * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-        # 转换为RGBA
-        img = img.convert('RGBA')
+        # 绘制渐变背景（按行计算颜色后整体广播到每一列，直接生成 RGBA 画布；
+        # 之后所有图层都就地混合到这张画布上，各绘制函数不再各自转换模式）
+        column = _background_gradient_column(total_height)
+        img = Image.fromarray(np.ascontiguousarray(np.broadcast_to(column[:, None, :], (total_height, width, 4))))
 
         # 增强背景装饰 - 波点 + 流动光线 + 星星粒子
         import random
-        random.seed(42)  # 固定种子保证每次生成相同图案
+        # 固定种子保证每次生成相同图案（使用独立的随机数生成器：多个群的总结可能在不同线程中同时渲染，
+        # 共用全局 random 会让各自的调用交错，也会重置宿主进程的全局随机状态）
+        rng = random.Random(42)
         bg_overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
         bg_draw = ImageDraw.Draw(bg_overlay)
 
         # 1. 绘制柔和波点
         for _ in range(80):
-            x = random.randint(0, width)
-            y = random.randint(0, total_height)
-            size = random.randint(30, 80)
+            x = rng.randint(0, width)
+            y = rng.randint(0, total_height)
+            size = rng.randint(30, 80)
             colors = [
                 (255, 200, 220, 25),  # 粉色
                 (200, 220, 255, 25),  # 蓝色
                 (220, 200, 255, 25),  # 紫色
                 (255, 240, 200, 25),  # 金色
             ]
-            color = random.choice(colors)
+            color = rng.choice(colors)
             bg_draw.ellipse([x, y, x + size, y + size], fill=color)
 
+        # 光束和星星都是逐像素覆盖写入的：按原绘制顺序收集所有像素 (x, y, RGBA)，最后一次性写入图层
+        point_xs = []
+        point_ys = []
+        point_colors = []
+
         # 2. 添加流动光线（斜向光束）
+        beam_colors = [
+            (200, 220, 255),  # 蓝色
+            (255, 200, 220),  # 粉色
+            (220, 200, 255),  # 紫色
+        ]
         for i in range(5):
-            start_x = random.randint(-200, width)
+            start_x = rng.randint(-200, width)
             start_y = i * (total_height // 5)
-            line_length = random.randint(400, 800)
-
-            # 绘制渐变光束
-            for step in range(line_length):
-                ratio = step / line_length
-                # 光束透明度（中间亮，两端暗）
-                alpha = int(50 * (1 - abs(2 * ratio - 1)))
-
-                # 光束颜色（随机选择）
-                beam_colors = [
-                    (200, 220, 255),  # 蓝色
-                    (255, 200, 220),  # 粉色
-                    (220, 200, 255),  # 紫色
-                ]
-                beam_color = beam_colors[i % len(beam_colors)]
-
-                x = start_x + step
-                y = start_y + step * 0.3  # 斜向
-
-                if 0 <= x < width and 0 <= y < total_height:
-                    # 绘制光束点（带渐变宽度）
-                    beam_width = int(3 * (1 - abs(2 * ratio - 1)))
-                    for w in range(-beam_width, beam_width + 1):
-                        draw_y = int(y + w)
-                        if 0 <= draw_y < total_height:
-                            pixel_alpha = int(alpha * (1 - abs(w) / max(1, beam_width)))
-                            bg_draw.point((int(x), draw_y), fill=beam_color + (pixel_alpha,))
+            line_length = rng.randint(400, 800)
+            beam_color = beam_colors[i % len(beam_colors)]
+
+            # 光束透明度和宽度（中间亮而宽，两端暗而窄）
+            step = np.arange(line_length)
+            fade = 1 - np.abs(2 * (step / line_length) - 1)
+            alpha = (50 * fade).astype(np.int64)
+            beam_width = (3 * fade).astype(np.int64)
+
+            x = start_x + step
+            y = start_y + step * 0.3  # 斜向
+            visible = (x >= 0) & (x < width) & (y >= 0) & (y < total_height)
+
+            # 绘制光束点（带渐变宽度），同一光束内的像素互不重叠
+            for w in range(-3, 4):
+                draw_y = (y + w).astype(np.int64)
+                keep = visible & (beam_width >= abs(w)) & (draw_y >= 0) & (draw_y < total_height)
+                pixel_alpha = (alpha * (1 - abs(w) / np.maximum(1, beam_width))).astype(np.int64)
+                colors = np.empty((int(keep.sum()), 4), dtype=np.int64)
+                colors[:, :3] = beam_color
+                colors[:, 3] = pixel_alpha[keep]
+                point_xs.append(x[keep])
+                point_ys.append(draw_y[keep])
+                point_colors.append(colors)
 
         # 3. 添加闪烁星星粒子
+        star_xs = []
+        star_ys = []
+        star_point_colors = []
         for _ in range(120):
-            star_x = random.randint(0, width)
-            star_y = random.randint(0, total_height)
-            star_size = random.choice([1, 2, 3])  # 不同大小的星星
+            star_x = rng.randint(0, width)
+            star_y = rng.randint(0, total_height)
+            star_size = rng.choice([1, 2, 3])  # 不同大小的星星
 
             # 星星颜色（柔和亮色）
             star_colors = [
@@ -1153,30 +1412,48 @@ class SummaryImageGenerator:
                 (255, 230, 240, 180),  # 粉白
                 (240, 230, 255, 180),  # 淡紫
             ]
-            star_color = random.choice(star_colors)
+            star_color = rng.choice(star_colors)
 
             if star_size == 1:
                 # 小星星：单点
-                bg_draw.point((star_x, star_y), fill=star_color)
+                star_points = [(star_x, star_y, star_color)]
             elif star_size == 2:
                 # 中星星：十字形
-                for dx, dy in [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    nx, ny = star_x + dx, star_y + dy
-                    if 0 <= nx < width and 0 <= ny < total_height:
-                        alpha = star_color[3] if dx == 0 and dy == 0 else star_color[3] // 2
-                        bg_draw.point((nx, ny), fill=star_color[:3] + (alpha,))
+                star_points = [
+                    (star_x + dx, star_y + dy, star_color if dx == 0 and dy == 0 else star_color[:3] + (star_color[3] // 2,))
+                    for dx, dy in [(0, 0), (-1, 0), (1, 0), (0, -1), (0, 1)]
+                ]
             else:
                 # 大星星：带光晕的十字
+                star_points = []
                 for r in range(3, 0, -1):
                     alpha = int(star_color[3] * (3 - r) / 3 * 0.6)
                     for dx, dy in [(0, r), (0, -r), (r, 0), (-r, 0)]:
-                        nx, ny = star_x + dx, star_y + dy
-                        if 0 <= nx < width and 0 <= ny < total_height:
-                            bg_draw.point((nx, ny), fill=star_color[:3] + (alpha,))
+                        star_points.append((star_x + dx, star_y + dy, star_color[:3] + (alpha,)))
                 # 中心点
-                bg_draw.point((star_x, star_y), fill=star_color)
-
-        img = Image.alpha_composite(img, bg_overlay)
+                star_points.append((star_x, star_y, star_color))
+
+            for nx, ny, color in star_points:
+                if 0 <= nx < width and 0 <= ny < total_height:
+                    star_xs.append(nx)
+                    star_ys.append(ny)
+                    star_point_colors.append(color)
+
+        point_xs.append(np.array(star_xs, dtype=np.int64))
+        point_ys.append(np.array(star_ys, dtype=np.int64))
+        point_colors.append(np.array(star_point_colors, dtype=np.int64).reshape(-1, 4))
+
+        # 一次写入所有像素（同一像素被多次写入时保留最后一次）
+        xs = np.concatenate(point_xs)
+        ys = np.concatenate(point_ys)
+        colors = np.concatenate(point_colors)
+        _, last = np.unique((ys * width + xs)[::-1], return_index=True)
+        last = len(xs) - 1 - last
+        pixels = np.array(bg_overlay)
+        pixels[ys[last], xs[last]] = colors[last]
+        bg_overlay = Image.fromarray(pixels)
+
+        _composite_overlay(img, bg_overlay)
 
         # 已删除：散落的装饰图标到背景
         # img = SummaryImageGenerator._add_scattered_background_decorations(
@@ -1196,7 +1473,7 @@ class SummaryImageGenerator:
         title_y = 80
 
         # 绘制彩色描边标题
-        img = SummaryImageGenerator._draw_colorful_text(
+        SummaryImageGenerator._draw_colorful_text(
             img,
             (title_x, title_y),
             title_clean,
@@ -1208,7 +1485,7 @@ class SummaryImageGenerator:
 
         # 添加decoration1装饰（标题左侧）
         deco1_path = os.path.join(plugin_dir, "decorations", "decoration1.png")
-        img = SummaryImageGenerator._add_decoration_with_glow(
+        SummaryImageGenerator._add_decoration_with_glow(
             img,
             deco1_path,
             (title_x - 200, title_y - 30),
@@ -1217,41 +1494,14 @@ class SummaryImageGenerator:
         )
 
         # 右侧镜像
-        if os.path.exists(deco1_path):
-            try:
-                deco1_img = Image.open(deco1_path).convert("RGBA")
-                w, h = deco1_img.size
-                scale = min(150 / w, 150 / h, 1.0)
-                new_w, new_h = int(w * scale), int(h * scale)
-                if scale < 1.0:
-                    deco1_img = deco1_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-                # 镜像翻转
-                deco1_flipped = deco1_img.transpose(Image.FLIP_LEFT_RIGHT)
-
-                # 手动添加光晕和图片（使用镜像后的图片）
-                paste_x = title_x + title_width + 50
-                paste_y = title_y - 30
-
-                # 添加柔和光晕
-                glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                for offset in range(15, 0, -2):
-                    alpha = int(40 * (15 - offset) / 15)
-                    glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
-                    glow_temp.paste(deco1_flipped, (offset, offset), deco1_flipped)
-                    color_layer = Image.new('RGBA', glow_temp.size, SummaryImageGenerator.BORDER_CYAN + (alpha,))
-                    glow_temp = Image.alpha_composite(glow_temp, color_layer)
-                    glow_layer.paste(glow_temp, (paste_x - offset, paste_y - offset), glow_temp)
-
-                glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
-                img = Image.alpha_composite(img, glow_layer)
-
-                # 粘贴镜像图片
-                overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                overlay.paste(deco1_flipped, (paste_x, paste_y), deco1_flipped)
-                img = Image.alpha_composite(img, overlay)
-            except Exception as e:
-                logger.error(f"添加镜像decoration1失败: {e}")
+        SummaryImageGenerator._add_decoration_with_glow(
+            img,
+            deco1_path,
+            (title_x + title_width + 50, title_y - 30),
+            (150, 150),
+            SummaryImageGenerator.BORDER_CYAN,
+            flip_h=True
+        )
 
         # 添加星星装饰
         star_path = os.path.join(plugin_dir, "decorations", "decoration_star.png")
@@ -1262,7 +1512,7 @@ class SummaryImageGenerator:
             (title_x + title_width + 290, 150),
         ]
         for pos in positions:
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 star_path,
                 pos,
@@ -1295,20 +1545,15 @@ class SummaryImageGenerator:
             badge_radius = badge_h // 2
             badge_x = (width - badge_w) // 2
 
-            # 创建独立的徽章图层
-            badge_img = Image.new('RGBA', (badge_w, badge_h), (0, 0, 0, 0))
-            badge_draw = ImageDraw.Draw(badge_img)
-
-            # 绘制徽章背景（渐变）
-            for i in range(badge_w):
-                ratio = i / badge_w
-                r = int(SummaryImageGenerator.GRADIENT_1_START[0] + (SummaryImageGenerator.GRADIENT_2_END[0] - SummaryImageGenerator.GRADIENT_1_START[0]) * ratio)
-                g = int(SummaryImageGenerator.GRADIENT_1_START[1] + (SummaryImageGenerator.GRADIENT_2_END[1] - SummaryImageGenerator.GRADIENT_1_START[1]) * ratio)
-                b = int(SummaryImageGenerator.GRADIENT_1_START[2] + (SummaryImageGenerator.GRADIENT_2_END[2] - SummaryImageGenerator.GRADIENT_1_START[2]) * ratio)
-                badge_draw.line(
-                    [(i, 0), (i, badge_h)],
-                    fill=(r, g, b, 230)
-                )
+            # 创建独立的徽章图层，背景为水平渐变（按列算好颜色后整体生成；透明度随后由圆角蒙版替换）
+            gradient = _linear_gradient(
+                badge_w,
+                SummaryImageGenerator.GRADIENT_1_START,
+                SummaryImageGenerator.GRADIENT_2_END
+            )
+            badge_img = Image.fromarray(
+                np.ascontiguousarray(np.broadcast_to(gradient[None, :, :], (badge_h, badge_w, 3)))
+            ).convert('RGBA')
 
             # 应用圆角蒙版
             mask = Image.new('L', (badge_w, badge_h), 0)
@@ -1335,16 +1580,14 @@ class SummaryImageGenerator:
             )
 
             # 将徽章合成到主图
-            overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-            overlay.paste(badge_img, (badge_x, badge_y), badge_img)
-            img = Image.alpha_composite(img, overlay)
+            _paste_composite(img, badge_img, (badge_x, badge_y))
 
         y = header_height
 
         # ===== 24小时发言分布图表 =====
         if hourly_distribution and any(hourly_distribution.values()):
             # 添加装饰性分隔线
-            img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+            SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
             y += 40
 
             # 标题
@@ -1354,7 +1597,7 @@ class SummaryImageGenerator:
             section_title_x = (width - section_title_width) // 2
 
             # 彩色描边标题
-            img = SummaryImageGenerator._draw_colorful_text(
+            SummaryImageGenerator._draw_colorful_text(
                 img,
                 (section_title_x, y + 20),
                 section_title,
@@ -1371,7 +1614,7 @@ class SummaryImageGenerator:
             card_width = width - SummaryImageGenerator.PADDING * 2
             chart_height = 250  # 从200增加到250，为数值标签预留空间
 
-            img = SummaryImageGenerator._draw_colorful_card(
+            SummaryImageGenerator._draw_colorful_card(
                 img,
                 (card_x, y, card_x + card_width, y + chart_height),
                 SummaryImageGenerator.BORDER_GREEN,
@@ -1381,7 +1624,7 @@ class SummaryImageGenerator:
 
             # 添加角落装饰
             corner_path = os.path.join(plugin_dir, "decorations", "decoration_corner.png")
-            img = SummaryImageGenerator._add_corner_decorations(
+            SummaryImageGenerator._add_corner_decorations(
                 img,
                 (card_x, y, card_x + card_width, y + chart_height),
                 corner_path,
@@ -1394,7 +1637,7 @@ class SummaryImageGenerator:
             chart_x2 = card_x + card_width - SummaryImageGenerator.CARD_PADDING
             chart_y2 = y + chart_height - SummaryImageGenerator.CARD_PADDING
 
-            img = SummaryImageGenerator._draw_hourly_chart(
+            SummaryImageGenerator._draw_hourly_chart(
                 img,
                 (chart_x1, chart_y1, chart_x2, chart_y2),
                 hourly_distribution,
@@ -1404,14 +1647,14 @@ class SummaryImageGenerator:
             y += chart_height + 50
 
         # 添加装饰性分隔线
-        img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+        SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
         y += 40
 
         # ===== 总结卡片（霓虹卡片） =====
         card_x = SummaryImageGenerator.PADDING
         card_width = width - SummaryImageGenerator.PADDING * 2
 
-        img = SummaryImageGenerator._draw_colorful_card(
+        SummaryImageGenerator._draw_colorful_card(
             img,
             (card_x, y, card_x + card_width, y + card_content_height),
             SummaryImageGenerator.BORDER_CYAN,
@@ -1421,7 +1664,7 @@ class SummaryImageGenerator:
 
         # 添加角落装饰
         corner_path = os.path.join(plugin_dir, "decorations", "decoration_corner.png")
-        img = SummaryImageGenerator._add_corner_decorations(
+        SummaryImageGenerator._add_corner_decorations(
             img,
             (card_x, y, card_x + card_width, y + card_content_height),
             corner_path,
@@ -1446,7 +1689,7 @@ class SummaryImageGenerator:
                 )
             text_y += line_height + 18  # 优化行间距从15到18
 
-        img = Image.alpha_composite(img, text_layer)
+        _composite_overlay(img, text_layer)
 
         # 在总结卡片角落添加闪光装饰
         sparkle_path = os.path.join(plugin_dir, "decorations", "decoration_sparkle.png")
@@ -1457,7 +1700,7 @@ class SummaryImageGenerator:
             (card_x + card_width - 55, y + card_content_height - 55),
         ]
         for pos in sparkle_positions:
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 sparkle_path,
                 pos,
@@ -1470,7 +1713,7 @@ class SummaryImageGenerator:
         # ===== 群友称号区域 =====
         if user_titles:
             # 添加装饰性分隔线
-            img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+            SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
             y += 40
 
             # 标题
@@ -1480,7 +1723,7 @@ class SummaryImageGenerator:
             section_title_x = (width - section_title_width) // 2
 
             # 彩色描边标题
-            img = SummaryImageGenerator._draw_colorful_text(
+            SummaryImageGenerator._draw_colorful_text(
                 img,
                 (section_title_x, y + 30),
                 section_title,
@@ -1492,7 +1735,7 @@ class SummaryImageGenerator:
 
             # 添加decoration3装饰（群友称号区域）
             deco3_path = os.path.join(plugin_dir, "decorations", "decoration3.png")
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 deco3_path,
                 (section_title_x - 150, y + 10),
@@ -1501,37 +1744,14 @@ class SummaryImageGenerator:
             )
 
             # 右侧镜像
-            if os.path.exists(deco3_path):
-                try:
-                    deco3_img = Image.open(deco3_path).convert("RGBA")
-                    w, h = deco3_img.size
-                    scale = min(120 / w, 120 / h, 1.0)
-                    new_w, new_h = int(w * scale), int(h * scale)
-                    if scale < 1.0:
-                        deco3_img = deco3_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-                    deco3_flipped = deco3_img.transpose(Image.FLIP_LEFT_RIGHT)
-                    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    paste_x = section_title_x + section_title_width + 30
-                    paste_y = y + 10
-
-                    # 添加柔和光晕
-                    glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    for offset in range(15, 0, -2):
-                        alpha = int(40 * (15 - offset) / 15)
-                        glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
-                        glow_temp.paste(deco3_flipped, (offset, offset), deco3_flipped)
-                        color_layer = Image.new('RGBA', glow_temp.size, SummaryImageGenerator.BORDER_MAGENTA + (alpha,))
-                        glow_temp = Image.alpha_composite(glow_temp, color_layer)
-                        glow_layer.paste(glow_temp, (paste_x - offset, paste_y - offset), glow_temp)
-
-                    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
-                    img = Image.alpha_composite(img, glow_layer)
-
-                    overlay.paste(deco3_flipped, (paste_x, paste_y), deco3_flipped)
-                    img = Image.alpha_composite(img, overlay)
-                except Exception as e:
-                    logger.error(f"添加镜像decoration3失败: {e}")
+            SummaryImageGenerator._add_decoration_with_glow(
+                img,
+                deco3_path,
+                (section_title_x + section_title_width + 30, y + 10),
+                (120, 120),
+                SummaryImageGenerator.BORDER_MAGENTA,
+                flip_h=True
+            )
 
             y += 150
 
@@ -1565,8 +1785,8 @@ class SummaryImageGenerator:
                 max_reason_width = max(max_reason_width, 200)
 
                 reason_lines = SummaryImageGenerator._wrap_text(reason, max_reason_width, font_small)
-                reason_line_height = font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]
-                title_line_height = font_subtitle.getbbox('测试')[3] - font_subtitle.getbbox('测试')[1]
+                reason_line_height = small_line_height
+                title_line_height = subtitle_line_height
 
                 # 新布局：卡片高度由头像高度和内容高度中的较大值决定
                 avatar_size = 100  # 头像尺寸
@@ -1578,7 +1798,7 @@ class SummaryImageGenerator:
 
                 # 彩色卡片
                 grad_start, grad_end, border_color = badge_colors[idx]
-                img = SummaryImageGenerator._draw_colorful_card(
+                SummaryImageGenerator._draw_colorful_card(
                     img,
                     (card_x, y, card_x + card_width, y + card_height),
                     border_color,
@@ -1588,7 +1808,7 @@ class SummaryImageGenerator:
 
                 # 添加角落装饰
                 corner_path = os.path.join(plugin_dir, "decorations", "decoration_corner.png")
-                img = SummaryImageGenerator._add_corner_decorations(
+                SummaryImageGenerator._add_corner_decorations(
                     img,
                     (card_x, y, card_x + card_width, y + card_height),
                     corner_path,
@@ -1604,7 +1824,7 @@ class SummaryImageGenerator:
                 avatar_added = False
                 if user_id:
                     try:
-                        avatar = await SummaryImageGenerator._download_qq_avatar(user_id, size=640)
+                        avatar = avatars.get((user_id, 640))
                         if avatar:
                             # 创建圆形头像
                             circular_avatar = SummaryImageGenerator._create_circular_avatar(avatar, avatar_size)
@@ -1612,7 +1832,7 @@ class SummaryImageGenerator:
                             # 添加带光晕的头像
                             avatar_x = content_x
                             avatar_y = content_y
-                            img = SummaryImageGenerator._add_avatar_glow(
+                            SummaryImageGenerator._add_avatar_glow(
                                 img,
                                 circular_avatar,
                                 (avatar_x, avatar_y),
@@ -1633,7 +1853,7 @@ class SummaryImageGenerator:
                 badge_x = middle_x
                 badge_y = middle_y
 
-                img = SummaryImageGenerator._draw_gradient_badge(
+                SummaryImageGenerator._draw_gradient_badge(
                     img,
                     (badge_x, badge_y),
                     (badge_w, badge_h),
@@ -1656,7 +1876,7 @@ class SummaryImageGenerator:
                         text_draw.text(
                             (name_x + offset_x, name_y + offset_y),
                             name,
-                            fill=SummaryImageGenerator.TITLE_COLOR,
+                            fill=ColorScheme.TITLE_COLOR_PACKED,
                             font=font_subtitle
                         )
 
@@ -1678,7 +1898,7 @@ class SummaryImageGenerator:
                     )
                     reason_y += reason_line_height + 8
 
-                img = Image.alpha_composite(img, text_layer)
+                _composite_overlay(img, text_layer)
 
                 y += card_height + SummaryImageGenerator.CARD_SPACING
 
@@ -1687,7 +1907,7 @@ class SummaryImageGenerator:
         # ===== 金句区域 =====
         if golden_quotes:
             # 添加装饰性分隔线
-            img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+            SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
             y += 40
 
             # 标题
@@ -1697,7 +1917,7 @@ class SummaryImageGenerator:
             section_title_x = (width - section_title_width) // 2
 
             # 彩色描边标题
-            img = SummaryImageGenerator._draw_colorful_text(
+            SummaryImageGenerator._draw_colorful_text(
                 img,
                 (section_title_x, y + 30),
                 section_title,
@@ -1709,7 +1929,7 @@ class SummaryImageGenerator:
 
             # 添加decoration4装饰（金句区域）
             deco4_path = os.path.join(plugin_dir, "decorations", "decoration4.png")
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 deco4_path,
                 (section_title_x - 150, y + 10),
@@ -1718,41 +1938,18 @@ class SummaryImageGenerator:
             )
 
             # 右侧镜像
-            if os.path.exists(deco4_path):
-                try:
-                    deco4_img = Image.open(deco4_path).convert("RGBA")
-                    w, h = deco4_img.size
-                    scale = min(120 / w, 120 / h, 1.0)
-                    new_w, new_h = int(w * scale), int(h * scale)
-                    if scale < 1.0:
-                        deco4_img = deco4_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-                    deco4_flipped = deco4_img.transpose(Image.FLIP_LEFT_RIGHT)
-                    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    paste_x = section_title_x + section_title_width + 30
-                    paste_y = y + 10
-
-                    # 添加柔和光晕
-                    glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    for offset in range(15, 0, -2):
-                        alpha = int(40 * (15 - offset) / 15)
-                        glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
-                        glow_temp.paste(deco4_flipped, (offset, offset), deco4_flipped)
-                        color_layer = Image.new('RGBA', glow_temp.size, SummaryImageGenerator.BORDER_ORANGE + (alpha,))
-                        glow_temp = Image.alpha_composite(glow_temp, color_layer)
-                        glow_layer.paste(glow_temp, (paste_x - offset, paste_y - offset), glow_temp)
-
-                    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
-                    img = Image.alpha_composite(img, glow_layer)
-
-                    overlay.paste(deco4_flipped, (paste_x, paste_y), deco4_flipped)
-                    img = Image.alpha_composite(img, overlay)
-                except Exception as e:
-                    logger.error(f"添加镜像decoration4失败: {e}")
+            SummaryImageGenerator._add_decoration_with_glow(
+                img,
+                deco4_path,
+                (section_title_x + section_title_width + 30, y + 10),
+                (120, 120),
+                SummaryImageGenerator.BORDER_ORANGE,
+                flip_h=True
+            )
 
             # 添加引号装饰
             quote_deco_path = os.path.join(plugin_dir, "decorations", "decoration_quote.png")
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 quote_deco_path,
                 (section_title_x - 80, y + 35),
@@ -1763,26 +1960,20 @@ class SummaryImageGenerator:
             y += 150
 
             # 金句卡片
-            for idx, quote_item in enumerate(golden_quotes[:4]):
-                content = quote_item.get("content", "")
+            for idx, (quote_item, (quote_lines, reason_lines)) in enumerate(zip(golden_quotes[:4], quotes_wrapped)):
                 sender = quote_item.get("sender", "")
-                reason = quote_item.get("reason", "")
 
-                # 计算高度
+                # 计算高度（换行结果在计算总高度时已得到）
                 content_x = card_x + SummaryImageGenerator.CARD_PADDING
-                max_quote_width = card_width - SummaryImageGenerator.CARD_PADDING * 2
-                quote_text = f'"{content}"'
-                quote_lines = SummaryImageGenerator._wrap_text(quote_text, max_quote_width, font_text)
-                reason_lines = SummaryImageGenerator._wrap_text(reason, max_quote_width, font_small)
 
-                quote_line_height = font_text.getbbox('测试')[3] - font_text.getbbox('测试')[1]
-                reason_line_height = font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]
+                quote_line_height = text_line_height
+                reason_line_height = small_line_height
 
                 card_height = 50 + len(quote_lines) * (quote_line_height + 12) + 50 + len(reason_lines) * (reason_line_height + 8) + 40
                 card_height = max(card_height, 200)
 
                 # 彩色卡片
-                img = SummaryImageGenerator._draw_colorful_card(
+                SummaryImageGenerator._draw_colorful_card(
                     img,
                     (card_x, y, card_x + card_width, y + card_height),
                     SummaryImageGenerator.BORDER_PINK,
@@ -1792,7 +1983,7 @@ class SummaryImageGenerator:
 
                 # 添加引号装饰（左侧）
                 quote_deco_path = os.path.join(plugin_dir, "decorations", "decoration_quote.png")
-                img = SummaryImageGenerator._add_decoration_with_glow(
+                SummaryImageGenerator._add_decoration_with_glow(
                     img,
                     quote_deco_path,
                     (card_x + 15, y + 15),
@@ -1802,7 +1993,7 @@ class SummaryImageGenerator:
 
                 # 添加角落装饰
                 corner_path = os.path.join(plugin_dir, "decorations", "decoration_corner.png")
-                img = SummaryImageGenerator._add_corner_decorations(
+                SummaryImageGenerator._add_corner_decorations(
                     img,
                     (card_x, y, card_x + card_width, y + card_height),
                     corner_path,
@@ -1811,7 +2002,7 @@ class SummaryImageGenerator:
 
                 # 添加心形装饰
                 heart_path = os.path.join(plugin_dir, "decorations", "decoration_heart.png")
-                img = SummaryImageGenerator._add_decoration_with_glow(
+                SummaryImageGenerator._add_decoration_with_glow(
                     img,
                     heart_path,
                     (card_x + card_width - 70, y + 20),
@@ -1860,14 +2051,14 @@ class SummaryImageGenerator:
                     )
                     reason_y += reason_line_height + 8
 
-                img = Image.alpha_composite(img, text_layer)
+                _composite_overlay(img, text_layer)
 
                 y += card_height + SummaryImageGenerator.CARD_SPACING
 
         # ===== 炫压抑指数区域 =====
         if depression_index:
             # 添加装饰性分隔线
-            img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+            SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
             y += 40
 
             # 标题
@@ -1877,7 +2068,7 @@ class SummaryImageGenerator:
             section_title_x = (width - section_title_width) // 2
 
             # 彩色描边标题
-            img = SummaryImageGenerator._draw_colorful_text(
+            SummaryImageGenerator._draw_colorful_text(
                 img,
                 (section_title_x, y + 30),
                 section_title,
@@ -1889,7 +2080,7 @@ class SummaryImageGenerator:
 
             # 添加decoration5装饰（炫压抑区域）
             deco5_path = os.path.join(plugin_dir, "decorations", "decoration5.png")
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 deco5_path,
                 (section_title_x - 150, y + 10),
@@ -1898,37 +2089,14 @@ class SummaryImageGenerator:
             )
 
             # 右侧镜像
-            if os.path.exists(deco5_path):
-                try:
-                    deco5_img = Image.open(deco5_path).convert("RGBA")
-                    w, h = deco5_img.size
-                    scale = min(120 / w, 120 / h, 1.0)
-                    new_w, new_h = int(w * scale), int(h * scale)
-                    if scale < 1.0:
-                        deco5_img = deco5_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-
-                    deco5_flipped = deco5_img.transpose(Image.FLIP_LEFT_RIGHT)
-                    overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    paste_x = section_title_x + section_title_width + 30
-                    paste_y = y + 10
-
-                    # 添加柔和光晕
-                    glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
-                    for offset in range(15, 0, -2):
-                        alpha = int(40 * (15 - offset) / 15)
-                        glow_temp = Image.new('RGBA', (new_w + offset * 2, new_h + offset * 2), (0, 0, 0, 0))
-                        glow_temp.paste(deco5_flipped, (offset, offset), deco5_flipped)
-                        color_layer = Image.new('RGBA', glow_temp.size, SummaryImageGenerator.BORDER_PURPLE + (alpha,))
-                        glow_temp = Image.alpha_composite(glow_temp, color_layer)
-                        glow_layer.paste(glow_temp, (paste_x - offset, paste_y - offset), glow_temp)
-
-                    glow_layer = glow_layer.filter(ImageFilter.GaussianBlur(radius=8))
-                    img = Image.alpha_composite(img, glow_layer)
-
-                    overlay.paste(deco5_flipped, (paste_x, paste_y), deco5_flipped)
-                    img = Image.alpha_composite(img, overlay)
-                except Exception as e:
-                    logger.error(f"添加镜像decoration5失败: {e}")
+            SummaryImageGenerator._add_decoration_with_glow(
+                img,
+                deco5_path,
+                (section_title_x + section_title_width + 30, y + 10),
+                (120, 120),
+                SummaryImageGenerator.BORDER_PURPLE,
+                flip_h=True
+            )
 
             y += 150
 
@@ -1960,7 +2128,7 @@ class SummaryImageGenerator:
                     border_color, text_color = rank_colors.get(rank, rank_colors["S"])
 
                     # 绘制卡片
-                    img = SummaryImageGenerator._draw_colorful_card(
+                    SummaryImageGenerator._draw_colorful_card(
                         img,
                         (col_x, y, col_x + col_width, y + card_h),
                         border_color,
@@ -1976,10 +2144,10 @@ class SummaryImageGenerator:
 
                     if user_id:
                         try:
-                            avatar = await SummaryImageGenerator._download_qq_avatar(user_id, size=640)
+                            avatar = avatars.get((user_id, 640))
                             if avatar:
                                 circular_avatar = SummaryImageGenerator._create_circular_avatar(avatar, avatar_size)
-                                img = SummaryImageGenerator._add_avatar_glow(
+                                SummaryImageGenerator._add_avatar_glow(
                                     img,
                                     circular_avatar,
                                     (avatar_x, avatar_y),
@@ -2010,7 +2178,7 @@ class SummaryImageGenerator:
 
                     # 先计算评价文本的行数和总高度
                     comment_lines = SummaryImageGenerator._wrap_text(comment, max_comment_width, font_small)
-                    comment_line_height = font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]
+                    comment_line_height = small_line_height
                     total_comment_height = len(comment_lines) * comment_line_height + (len(comment_lines) - 1) * 5
 
                     # 计算内容总高度（取rank和comment的最大值）
@@ -2060,7 +2228,7 @@ class SummaryImageGenerator:
                         )
                         comment_y += comment_line_height + 5
 
-                    img = Image.alpha_composite(img, text_layer)
+                    _composite_overlay(img, text_layer)
 
                 # 每行之后增加y（在内层循环结束后）
                 if col_idx == len(row_items) - 1:  # 只在处理完一行后增加
@@ -2085,7 +2253,7 @@ class SummaryImageGenerator:
             mood_reason = user_profile.get("mood_reason", "")
 
             # 添加装饰性分隔线
-            img = SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
+            SummaryImageGenerator._draw_decorative_divider(img, y + 10, width)
             y += 50  # 减少间距
 
             # 计算整体卡片高度（与前面计算保持一致）
@@ -2096,7 +2264,7 @@ class SummaryImageGenerator:
             card_x = SummaryImageGenerator.PADDING
             card_width = width - SummaryImageGenerator.PADDING * 2
 
-            img = SummaryImageGenerator._draw_colorful_card(
+            SummaryImageGenerator._draw_colorful_card(
                 img,
                 (card_x, y, card_x + card_width, y + total_card_height),
                 SummaryImageGenerator.BORDER_CYAN,
@@ -2111,24 +2279,26 @@ class SummaryImageGenerator:
 
             # 下载并绘制QQ头像
             if user_id:
-                avatar_img = await SummaryImageGenerator._download_qq_avatar(user_id, size=140)
+                avatar_img = avatars.get((user_id, 140))
                 if avatar_img:
                     avatar_img = avatar_img.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
-                    mask = Image.new('L', (avatar_size, avatar_size), 0)
-                    mask_draw = ImageDraw.Draw(mask)
-                    mask_draw.ellipse((0, 0, avatar_size, avatar_size), fill=255)
-                    avatar_img.putalpha(mask)
+                    avatar_img.putalpha(_circle_mask(avatar_size))
 
-                    glow_layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+                    # 光晕圆环最多向外扩展 16 像素，图层只覆盖这一范围，坐标相对于 (avatar_x - 16, top_y - 16)
+                    glow_extent = 16
+                    glow_layer = Image.new(
+                        'RGBA', (avatar_size + glow_extent * 2 + 1, avatar_size + glow_extent * 2 + 1), (0, 0, 0, 0)
+                    )
+                    glow_draw = ImageDraw.Draw(glow_layer)
                     # 增强光晕效果：更多层次，更高透明度，更粗线条
                     for i in range(8, 0, -1):
-                        glow_draw = ImageDraw.Draw(glow_layer)
+                        inset = glow_extent - i*2
                         glow_draw.ellipse(
-                            (avatar_x - i*2, top_y - i*2, avatar_x + avatar_size + i*2, top_y + avatar_size + i*2),
+                            (inset, inset, glow_layer.width - 1 - inset, glow_layer.height - 1 - inset),
                             outline=SummaryImageGenerator.BORDER_CYAN + (int(255 * (i / 8) * 0.8),),  # 透明度提升到80%
                             width=2
                         )
-                    img = Image.alpha_composite(img, glow_layer)
+                    _alpha_composite_at(img, glow_layer, (avatar_x - glow_extent, top_y - glow_extent))
                     img.paste(avatar_img, (avatar_x, top_y), avatar_img)
 
             # 右侧信息区域
@@ -2151,7 +2321,7 @@ class SummaryImageGenerator:
                 for i, tag_text in enumerate(tags[:3]):  # 支持最多3个标签
                     tag_bbox = font_text.getbbox(tag_text)
                     tag_w = tag_bbox[2] - tag_bbox[0] + 20
-                    tag_h = font_text.getbbox('测试')[3] - font_text.getbbox('测试')[1] + 10
+                    tag_h = text_line_height + 10
 
                     # 使用对应的渐变色
                     gradient_start, gradient_end = gradient_colors[i % 3]
@@ -2188,7 +2358,7 @@ class SummaryImageGenerator:
                 shadow_offset=1
             )
 
-            info_y += font_text.getbbox('测试')[3] - font_text.getbbox('测试')[1] + 15
+            info_y += text_line_height + 15
 
             # 3. 心情指数
             mood_text = f"心情: {mood} {mood_score}分"
@@ -2202,7 +2372,7 @@ class SummaryImageGenerator:
                 shadow_offset=1
             )
 
-            mood_text_height = font_text.getbbox('测试')[3] - font_text.getbbox('测试')[1]
+            mood_text_height = text_line_height
             info_y += mood_text_height + 10
 
             # 心情进度条（简化计算）
@@ -2240,7 +2410,7 @@ class SummaryImageGenerator:
             # 心情文本顶部: mood_text_y
             # 进度条底部: bar_y + bar_height
             # 中间位置: (mood_text_y + bar_y + bar_height) / 2
-            reason_y = (mood_text_y + bar_y + bar_height) // 2 - (font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1]) // 2
+            reason_y = (mood_text_y + bar_y + bar_height) // 2 - small_line_height // 2
 
             # 如果剩余宽度足够，显示在右侧；否则换行到下方
             if reason_max_width > 150:  # 至少需要150px宽度
@@ -2268,9 +2438,9 @@ class SummaryImageGenerator:
                         SummaryImageGenerator.LIGHT_TEXT_COLOR,
                         shadow_offset=1
                     )
-                    info_y += font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1] + 8  # 增加间距
+                    info_y += small_line_height + 8  # 增加间距
 
-            img = Image.alpha_composite(img, text_layer)
+            _composite_overlay(img, text_layer)
 
             # === 三个新指标区域 ===
             indicators_y = y + 145 + 30  # 增加间距从20到30
@@ -2283,7 +2453,7 @@ class SummaryImageGenerator:
                 fill=SummaryImageGenerator.BORDER_CYAN + (100,),
                 width=2
             )
-            img = Image.alpha_composite(img, line_layer)
+            _composite_overlay(img, line_layer)
 
             indicators_y += 30
 
@@ -2328,7 +2498,7 @@ class SummaryImageGenerator:
                     SummaryImageGenerator.LIGHT_TEXT_COLOR,
                     shadow_offset=1
                 )
-                indicators_y += font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1] + 4
+                indicators_y += small_line_height + 4
 
             indicators_y += 18
 
@@ -2339,7 +2509,7 @@ class SummaryImageGenerator:
                 fill=SummaryImageGenerator.BORDER_CYAN + (50,),
                 width=1
             )
-            img = Image.alpha_composite(img, line_layer)
+            _composite_overlay(img, line_layer)
             indicators_y += 18
 
             # === 2. 话题引导力 ===
@@ -2376,7 +2546,7 @@ class SummaryImageGenerator:
                     SummaryImageGenerator.LIGHT_TEXT_COLOR,
                     shadow_offset=1
                 )
-                indicators_y += font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1] + 4
+                indicators_y += small_line_height + 4
 
             indicators_y += 18
 
@@ -2388,7 +2558,7 @@ class SummaryImageGenerator:
                 fill=SummaryImageGenerator.BORDER_CYAN + (50,),
                 width=1
             )
-            img = Image.alpha_composite(img, line_layer)
+            _composite_overlay(img, line_layer)
             indicators_y += 18
 
             # === 3. 段位评定 ===
@@ -2425,9 +2595,9 @@ class SummaryImageGenerator:
                     SummaryImageGenerator.LIGHT_TEXT_COLOR,
                     shadow_offset=1
                 )
-                indicators_y += font_small.getbbox('测试')[3] - font_small.getbbox('测试')[1] + 4
+                indicators_y += small_line_height + 4
 
-            img = Image.alpha_composite(img, text_layer)
+            _composite_overlay(img, text_layer)
 
             y += total_card_height + 25
 
@@ -2436,20 +2606,17 @@ class SummaryImageGenerator:
 
         # 添加decoration2作为底部大型装饰
         deco2_path = os.path.join(plugin_dir, "decorations", "decoration2.png")
-        if os.path.exists(deco2_path):
+        deco2_mtime = _decoration_mtime(deco2_path)
+        if deco2_mtime is not None:
             try:
-                deco2_img = Image.open(deco2_path).convert("RGBA")
-                w, h = deco2_img.size
+                deco2_img = SummaryImageGenerator._load_decoration(deco2_path, (250, 140), mtime=deco2_mtime)
                 # 确保完整显示，调整最大尺寸（缩小装饰）
-                scale = min(250 / w, 140 / h, 1.0)
-                new_w, new_h = int(w * scale), int(h * scale)
-                if scale < 1.0:
-                    deco2_img = deco2_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+                new_w, new_h = deco2_img.size
 
                 paste_x = (width - new_w) // 2
                 paste_y = y + 20
 
-                img = SummaryImageGenerator._add_decoration_with_glow(
+                SummaryImageGenerator._add_decoration_with_glow(
                     img,
                     deco2_path,
                     (paste_x, paste_y),
@@ -2468,7 +2635,7 @@ class SummaryImageGenerator:
             (width - 230, y + 75),
         ]
         for pos in bubble_positions:
-            img = SummaryImageGenerator._add_decoration_with_glow(
+            SummaryImageGenerator._add_decoration_with_glow(
                 img,
                 bubble_path,
                 pos,
@@ -2495,8 +2662,8 @@ class SummaryImageGenerator:
             filename = f"summary_{uuid.uuid4().hex[:8]}.jpg"
             img_path = os.path.join(images_dir, filename)
 
-            # 保存图片
-            img.save(img_path, format='JPEG', quality=90, optimize=True)
+            # 保存图片（图片只发送一次，不开启 optimize：额外的哈夫曼表优化会让编码耗时接近翻倍，而文件只小约 7%）
+            img.save(img_path, format='JPEG', quality=90)
 
             if not os.path.exists(img_path):
                 raise IOError(f"图片保存失败")
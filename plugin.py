@@ -19,6 +19,7 @@
 
 import re
 import asyncio
+import functools
 import json
 import os
 from datetime import datetime, timedelta
@@ -40,11 +41,14 @@ from src.plugin_system import (
     get_logger,
 )
 from src.common.database.database_model import Messages
-from src.config.config import model_config
-from .core import SummaryImageGenerator, ChatAnalysisUtils
+from .core import SummaryImageGenerator, ChatAnalysisUtils, AnalysisConfig
 
 logger = get_logger("chat_summary_plugin")
 
+# CQ 码格式的 at，例如: [CQ:at,qq=123456]
+_CQ_AT_RE = re.compile(r'\[CQ:at,qq=(\d+)\]')
+_CQ_AT_STRIP_RE = re.compile(r'\[CQ:at,qq=\d+\]\s*')
+
 
 class ChatSummaryCommand(BaseCommand):
     """聊天记录总结命令"""
@@ -70,11 +74,11 @@ class ChatSummaryCommand(BaseCommand):
 
             # 检查是否指定了用户
             # 处理 CQ 码格式的 at，例如: [CQ:at,qq=123456]
-            at_match = re.search(r'\[CQ:at,qq=(\d+)\]', args)
+            at_match = _CQ_AT_RE.search(args)
             if at_match:
                 # 从消息中提取被at的用户QQ号，然后从消息历史中查找对应的昵称
                 # 这里先移除CQ码，保留剩余的时间参数
-                args_without_at = re.sub(r'\[CQ:at,qq=\d+\]\s*', '', args).strip()
+                args_without_at = _CQ_AT_STRIP_RE.sub('', args).strip()
                 # 暂时使用QQ号作为target_user，后续在查询时会匹配user_id
                 target_user = at_match.group(1)
                 time_range = args_without_at if args_without_at else "今天"
@@ -109,8 +113,14 @@ class ChatSummaryCommand(BaseCommand):
             user_info = f"@{target_user} " if target_user else ""
             await self.send_text(f"⏳ 正在分析{user_info}{time_range}的聊天记录，请稍候...")
 
+            # 群聊总结时一次遍历得到格式化文本、用户统计等中间结果
+            scan = ChatAnalysisUtils.scan_messages(messages) if not target_user else None
+
             # 生成总结
-            summary = await self._generate_summary(messages, target_user, time_range)
+            summary = await self._generate_summary(
+                messages, target_user, time_range,
+                chat_text=scan.formatted_text if scan else None
+            )
 
             if summary:
                 # 生成并发送图片
@@ -140,38 +150,24 @@ class ChatSummaryCommand(BaseCommand):
                     user_profile = None
 
                     if not target_user:
-                        participants = set()
-                        for msg in messages:
-                            nickname = msg.get("user_nickname", "")
-                            if nickname:
-                                participants.add(nickname)
-                        participant_count = len(participants)
-
-                        # 分析用户统计（仅群聊总结时）
-                        user_stats = ChatAnalysisUtils.analyze_user_stats(messages)
-
-                        # 计算24小时发言分布
-                        from collections import Counter
-                        hourly_distribution = Counter()
-                        for msg in messages:
-                            timestamp = msg.get("time", 0)
-                            hour = datetime.fromtimestamp(timestamp).hour
-                            hourly_distribution[hour] += 1
-                        # 转换为普通字典
-                        hourly_distribution = dict(hourly_distribution)
-
-                        # 分析群友称号（如果启用）
-                        if self.get_config("summary.enable_user_titles", True):
-                            user_titles = await ChatAnalysisUtils.analyze_user_titles(messages, user_stats) or []
-
-                        # 分析金句（如果启用）
-                        if self.get_config("summary.enable_golden_quotes", True):
-                            golden_quotes = await ChatAnalysisUtils.analyze_golden_quotes(messages) or []
-
-                        # 分析炫压抑指数（如果启用）
-                        depression_index = []
-                        if self.get_config("summary.enable_depression_index", True):
-                            depression_index = await ChatAnalysisUtils.analyze_depression_index(messages, user_stats) or []
+                        # 参与人数、用户统计、24小时发言分布均来自 scan_messages（仅群聊总结时）
+                        participant_count = scan.participant_count
+                        user_stats = scan.user_stats
+                        hourly_distribution = scan.hourly_distribution
+
+                        # 并发分析群友称号、金句和炫压抑指数（如果启用）
+                        analyses = await ChatAnalysisUtils.run_all_analyses(
+                            messages,
+                            user_stats,
+                            enable_titles=self.get_config("summary.enable_user_titles", True),
+                            enable_quotes=self.get_config("summary.enable_golden_quotes", True),
+                            enable_depression=self.get_config("summary.enable_depression_index", True),
+                            quotes_text=scan.quotes_text,
+                            user_samples=scan.user_samples,
+                        )
+                        user_titles = analyses["user_titles"]
+                        golden_quotes = analyses["golden_quotes"]
+                        depression_index = analyses["depression_index"]
                     else:
                         # 单个用户模式：分析用户画像
                         if self.get_config("summary.enable_user_summary", True):
@@ -326,7 +322,8 @@ class ChatSummaryCommand(BaseCommand):
             return []
 
     async def _generate_summary(
-        self, messages: List[dict], target_user: Optional[str], time_range: str
+        self, messages: List[dict], target_user: Optional[str], time_range: str,
+        chat_text: Optional[str] = None
     ) -> Optional[str]:
         """生成聊天记录总结
 
@@ -334,13 +331,15 @@ class ChatSummaryCommand(BaseCommand):
             messages: 聊天记录列表
             target_user: 目标用户昵称（可选）
             time_range: 时间范围描述
+            chat_text: 预先格式化好的聊天记录文本（可选），为 None 时从 messages 构建
 
         Returns:
             总结文本，失败返回None
         """
         try:
             # 构建聊天记录文本
-            chat_text = ChatAnalysisUtils.format_messages(messages)
+            if chat_text is None:
+                chat_text = ChatAnalysisUtils.format_messages(messages)
 
             # 获取人设和回复风格
             from src.config.config import global_config
@@ -405,7 +404,7 @@ class ChatSummaryCommand(BaseCommand):
 
             # 使用LLM生成总结
             # 使用主回复模型 (replyer)
-            model_task_config = model_config.model_task_config.replyer
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
 
             success, summary, reasoning, model_name = await llm_api.generate_with_model(
                 prompt=prompt,
@@ -632,104 +631,104 @@ class DailySummaryEventHandler(BaseEventHandler):
 
                 chat_id_to_group_id = filtered_chat_ids
 
-            # 为每个群聊生成总结
-            for chat_id, group_id in chat_id_to_group_id.items():
-                try:
-                    # 获取今天的聊天记录
-                    messages = await self._get_messages_for_chat(
-                        chat_id, start_time, end_time
+            # 为每个群聊生成总结（多个群聊并发处理，用信号量限制对 LLM 后端的并发请求）
+            await ChatAnalysisUtils.analyze_many(
+                [
+                    functools.partial(
+                        self._generate_chat_summary,
+                        chat_id, group_id, start_time, end_time, min_messages
                     )
+                    for chat_id, group_id in chat_id_to_group_id.items()
+                ],
+                concurrency=self.get_config("auto_summary.max_concurrency", AnalysisConfig.LLM_CONCURRENCY),
+            )
 
-                    # 检查消息数量是否达到最小要求
-                    if len(messages) < min_messages:
-                        continue
+        except Exception as e:
+            logger.error(f"生成每日总结失败: {e}", exc_info=True)
 
-                    # 生成总结
-                    summary = await self._generate_summary_for_chat(messages)
+    async def _generate_chat_summary(
+        self, chat_id: str, group_id, start_time: float, end_time: float, min_messages: int
+    ):
+        """为单个群聊生成并发送今日总结"""
+        try:
+            # 获取今天的聊天记录
+            messages = await self._get_messages_for_chat(
+                chat_id, start_time, end_time
+            )
 
-                    if summary:
-                        # 生成并发送图片
-                        try:
-                            # 统计参与用户
-                            participants = set()
-                            for msg in messages:
-                                nickname = msg.get("user_nickname", "")
-                                if nickname:
-                                    participants.add(nickname)
-
-                            # 分析用户统计
-                            user_stats = ChatAnalysisUtils.analyze_user_stats(messages)
-                            user_titles = []
-                            golden_quotes = []
-
-                            # 计算24小时发言分布
-                            from collections import Counter
-                            hourly_distribution = Counter()
-                            for msg in messages:
-                                timestamp = msg.get("time", 0)
-                                hour = datetime.fromtimestamp(timestamp).hour
-                                hourly_distribution[hour] += 1
-                            # 转换为普通字典
-                            hourly_distribution = dict(hourly_distribution)
-
-                            # 分析群友称号（如果启用）
-                            if self.get_config("summary.enable_user_titles", True):
-                                user_titles = await ChatAnalysisUtils.analyze_user_titles(messages, user_stats) or []
-
-                            # 分析金句（如果启用）
-                            if self.get_config("summary.enable_golden_quotes", True):
-                                golden_quotes = await ChatAnalysisUtils.analyze_golden_quotes(messages) or []
-
-                            # 分析炫压抑指数（如果启用）
-                            depression_index = []
-                            if self.get_config("summary.enable_depression_index", True):
-                                depression_index = await ChatAnalysisUtils.analyze_depression_index(messages, user_stats) or []
-
-                            # 生成图片并获取临时文件路径
-                            img_path = await SummaryImageGenerator.generate_summary_image(
-                                title="📊 今日群聊总结",
-                                summary_text=summary,
-                                time_info=datetime.now().strftime("%Y-%m-%d"),
-                                message_count=len(messages),
-                                participant_count=len(participants),
-                                user_titles=user_titles,
-                                golden_quotes=golden_quotes,
-                                depression_index=depression_index,
-                                hourly_distribution=hourly_distribution
-                            )
+            # 检查消息数量是否达到最小要求
+            if len(messages) < min_messages:
+                return
+
+            # 一次遍历得到格式化文本、用户统计等中间结果
+            scan = ChatAnalysisUtils.scan_messages(messages)
+
+            # 生成总结
+            summary = await self._generate_summary_for_chat(messages, scan.formatted_text)
+
+            if summary:
+                # 生成并发送图片
+                try:
+                    # 参与人数、用户统计、24小时发言分布均来自 scan_messages
+                    user_stats = scan.user_stats
+                    hourly_distribution = scan.hourly_distribution
+
+                    # 并发分析群友称号、金句和炫压抑指数（如果启用）
+                    analyses = await ChatAnalysisUtils.run_all_analyses(
+                        messages,
+                        user_stats,
+                        enable_titles=self.get_config("summary.enable_user_titles", True),
+                        enable_quotes=self.get_config("summary.enable_golden_quotes", True),
+                        enable_depression=self.get_config("summary.enable_depression_index", True),
+                        quotes_text=scan.quotes_text,
+                        user_samples=scan.user_samples,
+                    )
+                    user_titles = analyses["user_titles"]
+                    golden_quotes = analyses["golden_quotes"]
+                    depression_index = analyses["depression_index"]
+
+                    # 生成图片并获取临时文件路径
+                    img_path = await SummaryImageGenerator.generate_summary_image(
+                        title="📊 今日群聊总结",
+                        summary_text=summary,
+                        time_info=datetime.now().strftime("%Y-%m-%d"),
+                        message_count=len(messages),
+                        participant_count=scan.participant_count,
+                        user_titles=user_titles,
+                        golden_quotes=golden_quotes,
+                        depression_index=depression_index,
+                        hourly_distribution=hourly_distribution
+                    )
 
-                            # 发送图片
-                            try:
-                                if not os.path.exists(img_path):
-                                    raise FileNotFoundError(f"图片文件不存在: {img_path}")
-
-                                with open(img_path, 'rb') as f:
-                                    img_data = f.read()
-
-                                import base64
-                                img_base64 = base64.b64encode(img_data).decode('utf-8')
-                                await send_api.image_to_stream(img_base64, chat_id, storage_message=False)
-                                await asyncio.sleep(2)
-                            finally:
-                                try:
-                                    if os.path.exists(img_path):
-                                        os.remove(img_path)
-                                except Exception as e:
-                                    logger.warning(f"清理临时图片失败: {e}")
+                    # 发送图片
+                    try:
+                        if not os.path.exists(img_path):
+                            raise FileNotFoundError(f"图片文件不存在: {img_path}")
+
+                        with open(img_path, 'rb') as f:
+                            img_data = f.read()
 
+                        import base64
+                        img_base64 = base64.b64encode(img_data).decode('utf-8')
+                        await send_api.image_to_stream(img_base64, chat_id, storage_message=False)
+                        await asyncio.sleep(2)
+                    finally:
+                        try:
+                            if os.path.exists(img_path):
+                                os.remove(img_path)
                         except Exception as e:
-                            logger.error(f"生成图片失败，使用文本输出: {e}", exc_info=True)
-                            # 降级到文本输出
-                            prefix = "📊 今日群聊总结\n\n"
-                            await send_api.text_to_stream(prefix + summary, chat_id, storage_message=False)
-                    else:
-                        logger.warning(f"群聊 {group_id} 总结生成失败")
+                            logger.warning(f"清理临时图片失败: {e}")
 
                 except Exception as e:
-                    logger.error(f"为群聊 {group_id} 生成总结失败: {e}", exc_info=True)
+                    logger.error(f"生成图片失败，使用文本输出: {e}", exc_info=True)
+                    # 降级到文本输出
+                    prefix = "📊 今日群聊总结\n\n"
+                    await send_api.text_to_stream(prefix + summary, chat_id, storage_message=False)
+            else:
+                logger.warning(f"群聊 {group_id} 总结生成失败")
 
         except Exception as e:
-            logger.error(f"生成每日总结失败: {e}", exc_info=True)
+            logger.error(f"为群聊 {group_id} 生成总结失败: {e}", exc_info=True)
 
     async def _get_messages_for_chat(
         self, chat_id: str, start_time: float, end_time: float
@@ -768,11 +767,14 @@ class DailySummaryEventHandler(BaseEventHandler):
             logger.error(f"获取群聊 {chat_id} 的聊天记录出错: {e}", exc_info=True)
             return []
 
-    async def _generate_summary_for_chat(self, messages: List[dict]) -> Optional[str]:
+    async def _generate_summary_for_chat(
+        self, messages: List[dict], chat_text: Optional[str] = None
+    ) -> Optional[str]:
         """为指定聊天记录生成总结"""
         try:
             # 构建聊天记录文本
-            chat_text = ChatAnalysisUtils.format_messages(messages)
+            if chat_text is None:
+                chat_text = ChatAnalysisUtils.format_messages(messages)
 
             # 获取人设和回复风格
             from src.config.config import global_config
@@ -812,7 +814,7 @@ class DailySummaryEventHandler(BaseEventHandler):
 直接开始，不要标题。记住：必须在{max_words}字以内完成！"""
 
             # 使用LLM生成总结
-            model_task_config = model_config.model_task_config.replyer
+            model_task_config = ChatAnalysisUtils.get_replyer_config()
 
             success, summary, reasoning, model_name = await llm_api.generate_with_model(
                 prompt=prompt,
@@ -871,6 +873,7 @@ class ChatSummaryPlugin(BasePlugin):
             "time": ConfigField(type=str, default="23:00", description="每日自动总结的时间（HH:MM格式）"),
             "timezone": ConfigField(type=str, default="Asia/Shanghai", description="时区设置（需安装pytz模块）"),
             "min_messages": ConfigField(type=int, default=10, description="生成总结所需的最少消息数量"),
+            "max_concurrency": ConfigField(type=int, default=3, description="同时生成总结的群聊数量上限"),
             "target_chats": ConfigField(type=list, default=[], description="目标群聊QQ号列表（为空则对所有群聊生效）"),
         },
     }